@@ -5,6 +5,7 @@ A local Streamlit dashboard to visualize congressional trading data.
 Run with: streamlit run dashboard.py
 """
 
+import sqlite3
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -12,6 +13,7 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -29,6 +31,110 @@ st.set_page_config(
 # Initialize database
 db.init_db()
 
+# How long cached query results stay fresh (seconds). Data only changes on sync,
+# so widget interactions can reuse results instead of re-querying SQLite.
+CACHE_TTL = 300
+
+CHAMBER_DTYPE = pd.CategoricalDtype(['house', 'senate'])
+CHAMBER_LABELS = {'house': 'House', 'senate': 'Senate'}
+
+# Sharpe ratios at or beyond this magnitude are treated as invalid outliers
+MAX_ABS_SHARPE = 100
+
+
+def get_conn() -> sqlite3.Connection:
+    """Read-only connection reused across reruns of this browser session."""
+    if "db_conn" not in st.session_state:
+        # Streamlit may run each rerun on a different thread
+        conn = sqlite3.connect(
+            f"{config.DB_PATH.as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        st.session_state.db_conn = conn
+    return st.session_state.db_conn
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast id/count columns and store repeated labels as categoricals."""
+    for col in ('member_id', 'num_trades'):
+        if col in df.columns:
+            df[col] = df[col].astype('int32')
+    if 'chamber' in df.columns:
+        df['chamber'] = df['chamber'].astype(CHAMBER_DTYPE)
+    for col in ('transaction_type', 'ticker'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def arrow_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """Use pyarrow-backed dtypes so st.dataframe can ship the columns as-is."""
+    return df.convert_dtypes(dtype_backend='pyarrow')
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_snapshot_date() -> Optional[str]:
+    """Date of the latest Sharpe snapshot, None before the first analysis."""
+    return db.get_latest_snapshot_date(conn=get_conn())
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_sharpe(chamber: Optional[str] = None) -> pd.DataFrame:
+    """Latest valid Sharpe rankings for a chamber (or all), best first.
+
+    Reads the rankings file written by `analyze` when it matches the latest
+    snapshot, otherwise falls back to the database. Either way the chamber
+    and validity filters are applied by the reader, not in pandas.
+    """
+    snapshot_date = load_snapshot_date()
+    if snapshot_date:
+        path = config.CACHE_DIR / config.RANKINGS_CACHE_FILE.format(snapshot_date=snapshot_date)
+        if path.exists():
+            filters = [('sharpe_30d', '>', -MAX_ABS_SHARPE), ('sharpe_30d', '<', MAX_ABS_SHARPE)]
+            if chamber:
+                filters.append(('chamber', '==', chamber))
+            try:
+                return compact_dtypes(pd.read_parquet(path, filters=filters))
+            except ImportError:
+                pass
+    return compact_dtypes(pd.DataFrame(db.get_latest_sharpe(
+        chamber=chamber, max_abs_sharpe=MAX_ABS_SHARPE, conn=get_conn()
+    )))
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_recent(days: int, limit: int) -> pd.DataFrame:
+    """Trades disclosed in the last N days."""
+    return compact_dtypes(pd.DataFrame(db.get_recent_trades(days=days, limit=limit, conn=get_conn())))
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_member_names() -> pd.DataFrame:
+    """All member names for the member dropdown."""
+    return pd.read_sql_query(
+        "SELECT DISTINCT name FROM members ORDER BY name", get_conn(), dtype_backend='pyarrow'
+    )
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_member_trades(name: str, limit: int = 100) -> pd.DataFrame:
+    """Trades for a member (partial name match)."""
+    return compact_dtypes(pd.DataFrame(db.get_trades_by_member(name, limit=limit, conn=get_conn())))
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_sharpe_history(name: str) -> pd.DataFrame:
+    """Sharpe snapshot history for a member, oldest first."""
+    return pd.read_sql_query(
+        """SELECT ss.snapshot_date, ss.sharpe_30d, ss.sharpe_current, ss.win_rate_30d, ss.num_trades
+           FROM sharpe_snapshots ss
+           JOIN members m ON ss.member_id = m.id
+           WHERE m.name = ?
+           ORDER BY ss.snapshot_date""",
+        get_conn(), params=(name,)
+    )
+
+
 # Title
 st.title("🏛️ Congress Trades Tracker")
 st.markdown("---")
@@ -42,39 +148,32 @@ chamber_filter = st.sidebar.selectbox(
     ["All", "House", "Senate"]
 )
 
-# Top N members
-top_n = st.sidebar.slider("Top N Members", 10, 50, 20)
-
-# Days for recent trades
-recent_days = st.sidebar.slider("Recent Trades (days)", 7, 90, 30)
-
 # Main content - tabs
 tab1, tab2, tab3 = st.tabs(["📊 Sharpe Rankings", "📈 Member Details", "🔄 Recent Trades"])
 
+# Each tab is a fragment: changing a widget inside one tab reruns only that
+# tab, not the whole script. Only the chamber filter is global.
+
 # ============== TAB 1: Sharpe Rankings ==============
-with tab1:
+@st.fragment
+def render_rankings(chamber_filter: str) -> None:
     st.header("Sharpe Ratio Rankings")
 
-    # Get latest Sharpe data
-    rankings = db.get_latest_sharpe_all_members()
+    # Top N members
+    top_n = st.slider("Top N Members", 10, 50, 20)
 
-    if not rankings:
+    if not load_snapshot_date():
         st.warning("No Sharpe data found. Run `py main.py analyze` first.")
     else:
-        df = pd.DataFrame(rankings)
-
-        # Apply chamber filter
-        if chamber_filter != "All":
-            df = df[df['chamber'] == chamber_filter.lower()]
-
-        # Filter out extreme/invalid Sharpe values
-        df_valid = df[df['sharpe_30d'].notna() & (df['sharpe_30d'].abs() < 100)].copy()
+        # Latest valid Sharpe data for the selected chamber, best first
+        chamber = None if chamber_filter == "All" else chamber_filter.lower()
+        df_valid = load_sharpe(chamber)
 
         if df_valid.empty:
             st.warning("No valid Sharpe ratios to display.")
         else:
-            # Top performers
-            df_top = df_valid.nlargest(top_n, 'sharpe_30d')
+            # Top performers (already sorted by the query)
+            df_top = df_valid.head(top_n)
 
             col1, col2 = st.columns(2)
 
@@ -92,7 +191,8 @@ with tab1:
                     hover_data=['win_rate_30d', 'num_trades']
                 )
                 fig.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
+                    # Rows are already best first; list them bottom-up
+                    yaxis={'categoryorder': 'array', 'categoryarray': df_top['member_name'].tolist()[::-1]},
                     height=max(400, top_n * 25),
                     showlegend=True,
                     legend_title="Chamber"
@@ -120,7 +220,8 @@ with tab1:
                         'sharpe_30d': 'Sharpe Ratio (30-day)',
                         'win_rate_pct': 'Win Rate (%)',
                         'num_trades': 'Number of Trades'
-                    }
+                    },
+                    render_mode='webgl'
                 )
                 fig2.update_layout(height=500)
                 st.plotly_chart(fig2, use_container_width=True)
@@ -130,22 +231,33 @@ with tab1:
 
             display_df = df_valid[['member_name', 'chamber', 'sharpe_30d', 'win_rate_30d', 'num_trades']].copy()
             display_df.columns = ['Member', 'Chamber', 'Sharpe (30d)', 'Win Rate', 'Trades']
-            display_df['Win Rate'] = display_df['Win Rate'].apply(lambda x: f"{x*100:.1f}%" if pd.notna(x) else "N/A")
-            display_df['Sharpe (30d)'] = display_df['Sharpe (30d)'].apply(lambda x: f"{x:.3f}" if pd.notna(x) else "N/A")
-            display_df['Chamber'] = display_df['Chamber'].str.title()
+            display_df['Win Rate'] = display_df['Win Rate'] * 100
+            display_df['Chamber'] = display_df['Chamber'].map(CHAMBER_LABELS)
             display_df = display_df.reset_index(drop=True)
             display_df.index = display_df.index + 1
 
-            st.dataframe(display_df, use_container_width=True, height=400)
+            # Numbers are formatted by the frontend, not per row in Python
+            st.dataframe(
+                arrow_backed(display_df),
+                use_container_width=True,
+                height=400,
+                column_config={
+                    'Sharpe (30d)': st.column_config.NumberColumn(format="%.3f"),
+                    'Win Rate': st.column_config.NumberColumn(format="%.1f%%"),
+                }
+            )
+
+
+with tab1:
+    render_rankings(chamber_filter)
 
 # ============== TAB 2: Member Details ==============
-with tab2:
+@st.fragment
+def render_member_details() -> None:
     st.header("Member Details")
 
     # Get all members for dropdown
-    conn = db.get_connection()
-    members_df = pd.read_sql_query("SELECT DISTINCT name FROM members ORDER BY name", conn)
-    conn.close()
+    members_df = load_member_names()
 
     if members_df.empty:
         st.warning("No members found in database.")
@@ -154,11 +266,9 @@ with tab2:
 
         if selected_member:
             # Get member's trades
-            trades = db.get_trades_by_member(selected_member, limit=100)
-
-            if trades:
-                trades_df = pd.DataFrame(trades)
+            trades_df = load_member_trades(selected_member, limit=100)
 
+            if not trades_df.empty:
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     st.metric("Total Trades", len(trades_df))
@@ -170,60 +280,54 @@ with tab2:
                     st.metric("Sales", sells)
 
                 # Get Sharpe history
-                conn = db.get_connection()
-                member_id_result = conn.execute(
-                    "SELECT id FROM members WHERE name = ?", (selected_member,)
-                ).fetchone()
-
-                if member_id_result:
-                    member_id = member_id_result['id']
-                    sharpe_history = pd.read_sql_query(
-                        """SELECT snapshot_date, sharpe_30d, sharpe_current, win_rate_30d, num_trades
-                           FROM sharpe_snapshots WHERE member_id = ? ORDER BY snapshot_date""",
-                        conn, params=(member_id,)
+                sharpe_history = load_sharpe_history(selected_member)
+
+                if not sharpe_history.empty and len(sharpe_history) > 1:
+                    st.subheader("Sharpe Ratio History")
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Scattergl(
+                        x=sharpe_history['snapshot_date'],
+                        y=sharpe_history['sharpe_30d'],
+                        mode='lines+markers',
+                        name='30-Day Sharpe'
+                    ))
+                    fig.update_layout(
+                        xaxis_title="Date",
+                        yaxis_title="Sharpe Ratio",
+                        height=400
                     )
-                    conn.close()
-
-                    if not sharpe_history.empty and len(sharpe_history) > 1:
-                        st.subheader("Sharpe Ratio History")
-
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(
-                            x=sharpe_history['snapshot_date'],
-                            y=sharpe_history['sharpe_30d'],
-                            mode='lines+markers',
-                            name='30-Day Sharpe'
-                        ))
-                        fig.update_layout(
-                            xaxis_title="Date",
-                            yaxis_title="Sharpe Ratio",
-                            height=400
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    conn.close()
+                    st.plotly_chart(fig, use_container_width=True)
 
                 # Recent trades table
                 st.subheader("Recent Trades")
                 display_trades = trades_df[['transaction_date', 'ticker', 'transaction_type', 'amount_range']].copy()
                 display_trades.columns = ['Date', 'Ticker', 'Type', 'Amount']
                 display_trades['Type'] = display_trades['Type'].str.title()
-                st.dataframe(display_trades, use_container_width=True, height=400)
+                st.dataframe(arrow_backed(display_trades), use_container_width=True, height=400)
             else:
                 st.info(f"No trades found for {selected_member}")
 
+
+with tab2:
+    render_member_details()
+
 # ============== TAB 3: Recent Trades ==============
-with tab3:
-    st.header(f"Recent Trades (Last {recent_days} Days)")
+@st.fragment
+def render_recent_trades() -> None:
+    header = st.empty()
+
+    # Days for recent trades
+    recent_days = st.slider("Recent Trades (days)", 7, 90, 30)
+
+    header.header(f"Recent Trades (Last {recent_days} Days)")
 
     # Get recent trades
-    trades = db.get_recent_trades(days=recent_days, limit=500)
+    trades_df = load_recent(recent_days, 500)
 
-    if not trades:
+    if trades_df.empty:
         st.warning(f"No trades found in the last {recent_days} days.")
     else:
-        trades_df = pd.DataFrame(trades)
-
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -256,12 +360,17 @@ with tab3:
         if tx_type_filter != "All":
             filtered_df = filtered_df[filtered_df['transaction_type'] == tx_type_filter.lower()]
         if ticker_search:
-            filtered_df = filtered_df[filtered_df['ticker'].str.contains(ticker_search.upper(), na=False)]
+            # Prefix match on the distinct tickers only, then select rows by category
+            tickers = filtered_df['ticker'].cat.categories
+            matches = tickers[tickers.str.startswith(ticker_search.upper())]
+            filtered_df = filtered_df[filtered_df['ticker'].isin(matches)]
 
         # Most traded tickers
         if not filtered_df.empty and 'ticker' in filtered_df.columns:
             st.subheader("Most Traded Tickers")
-            ticker_counts = filtered_df['ticker'].value_counts().head(15)
+            ticker_counts = filtered_df['ticker'].value_counts()
+            # Categorical value_counts also lists tickers with no remaining rows
+            ticker_counts = ticker_counts[ticker_counts > 0].head(15)
 
             fig = px.bar(
                 x=ticker_counts.values,
@@ -279,10 +388,14 @@ with tab3:
         st.subheader("Trade Details")
         display_df = filtered_df[['transaction_date', 'member_name', 'chamber', 'ticker', 'transaction_type', 'amount_range']].copy()
         display_df.columns = ['Date', 'Member', 'Chamber', 'Ticker', 'Type', 'Amount']
-        display_df['Chamber'] = display_df['Chamber'].str.title()
+        display_df['Chamber'] = display_df['Chamber'].map(CHAMBER_LABELS)
         display_df['Type'] = display_df['Type'].str.title()
 
-        st.dataframe(display_df, use_container_width=True, height=500)
+        st.dataframe(arrow_backed(display_df), use_container_width=True, height=500)
+
+
+with tab3:
+    render_recent_trades()
 
 # Footer
 st.markdown("---")
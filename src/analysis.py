@@ -5,8 +5,12 @@ Calculates and stores risk-adjusted returns for each Congress member.
 All data is stored in the database for historical tracking.
 """
 
+import json
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from itertools import chain
+from pathlib import Path
 from typing import Optional
 import warnings
 warnings.filterwarnings('ignore')
@@ -22,11 +26,25 @@ from . import db
 RISK_FREE_RATE_ANNUAL = 0.045  # 4.5%
 RISK_FREE_RATE_DAILY = RISK_FREE_RATE_ANNUAL / 252
 
+# In-memory dtype for price series. float32 halves the footprint of the price
+# cache; returns are still computed in float64 from the gathered prices.
+PRICE_DTYPE = 'float32'
+
+
+def get_trades_for_analysis(incremental: bool = False) -> pd.DataFrame:
+    """Get trades with tickers from the database.
+
+    With incremental=True, only trades without a stored 30-day return or
+    whose current return was last refreshed before today are returned.
+    """
+    join, where, params = "", "", ()
+    if incremental:
+        join = "LEFT JOIN trade_returns tr ON tr.trade_id = t.id"
+        where = "AND (tr.return_30d IS NULL OR tr.return_current_date < ?)"
+        params = (datetime.now().strftime('%Y-%m-%d'),)
 
-def get_trades_for_analysis() -> pd.DataFrame:
-    """Get all trades with tickers from the database."""
     conn = db.get_connection()
-    query = """
+    query = f"""
         SELECT
             t.id as trade_id,
             m.id as member_id,
@@ -39,17 +57,35 @@ def get_trades_for_analysis() -> pd.DataFrame:
             t.amount_range
         FROM trades t
         JOIN members m ON t.member_id = m.id
+        {join}
         WHERE t.ticker IS NOT NULL
           AND t.ticker != ''
           AND t.transaction_type IN ('purchase', 'sale')
+          {where}
         ORDER BY t.transaction_date
     """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = pd.read_sql_query(query, conn, params=params)
     df['transaction_date'] = pd.to_datetime(df['transaction_date'])
     return df
 
 
+def get_stored_returns() -> pd.DataFrame:
+    """Get all stored trade returns in the calculate_and_store_returns layout."""
+    columns = [
+        'trade_id', 'member_id', 'member_name', 'chamber', 'party',
+        'ticker', 'transaction_type', 'return_30d', 'return_current',
+    ]
+    rows = db.iter_all_trade_returns()
+    first = next(rows, None)
+    if first is None:
+        df = pd.DataFrame(columns=columns)
+    else:
+        # Build the frame straight from the rows; no per-row dicts
+        df = pd.DataFrame.from_records(chain([first], rows), columns=first.keys())[columns]
+    df[['return_30d', 'return_current']] = df[['return_30d', 'return_current']].astype(float)
+    return df
+
+
 def get_cached_price_df(ticker: str) -> pd.DataFrame:
     """Get cached prices as a DataFrame."""
     conn = db.get_connection()
@@ -57,70 +93,112 @@ def get_cached_price_df(ticker: str) -> pd.DataFrame:
         "SELECT price_date, close_price FROM price_cache WHERE ticker = ? ORDER BY price_date",
         conn, params=(ticker,)
     )
-    conn.close()
     if not df.empty:
         df['price_date'] = pd.to_datetime(df['price_date'])
+        df['close_price'] = df['close_price'].astype(PRICE_DTYPE)
         df.set_index('price_date', inplace=True)
     return df
 
 
-def fetch_and_cache_prices(tickers: list[str], start_date: datetime) -> dict:
+def get_cached_price_series(tickers: list[str], chunk_size: int = 500) -> dict:
+    """Get cached prices for many tickers at once. Returns {ticker: price_series}."""
+    prices = {}
+    conn = db.get_connection()
+    # Chunk to stay under SQLite's bound-parameter limit
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i+chunk_size]
+        placeholders = ",".join("?" * len(chunk))
+        df = pd.read_sql_query(
+            f"""SELECT ticker, price_date, close_price FROM price_cache
+                WHERE ticker IN ({placeholders})
+                ORDER BY ticker, price_date""",
+            conn, params=chunk, parse_dates=['price_date']
+        )
+        for ticker, group in df.groupby('ticker', sort=False):
+            prices[ticker] = group.set_index('price_date')['close_price'].astype(PRICE_DTYPE)
+    return prices
+
+
+def fetch_and_cache_prices(
+    tickers: list[str],
+    start_date: datetime,
+    max_workers: Optional[int] = None
+) -> dict:
     """Fetch prices from Yahoo Finance and cache them. Returns {ticker: price_series}."""
     print(f"Fetching prices for {len(tickers)} tickers...")
 
     all_prices = {}
     batch_size = 50
+    max_workers = max_workers or config.FETCH_WORKERS
     today = datetime.now()
+    batches = [tickers[i:i+batch_size] for i in range(0, len(tickers), batch_size)]
+
+    def fetch_batch(batch: list[str]) -> pd.DataFrame:
+        # yfinance's own thread pool is disabled; batches run in ours instead
+        return yf.download(
+            batch,
+            start=start_date,
+            end=today,
+            progress=False,
+            auto_adjust=True,
+            threads=False
+        )
 
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i+batch_size]
-        print(f"  Batch {i//batch_size + 1}: {len(batch)} tickers...")
-
-        try:
-            data = yf.download(
-                batch,
-                start=start_date,
-                end=today,
-                progress=False,
-                auto_adjust=True
-            )
-
-            if len(batch) == 1:
-                if not data.empty:
-                    ticker = batch[0]
-                    prices = data['Close'].dropna()
-                    all_prices[ticker] = prices
-                    # Cache prices
-                    price_dict = {d.strftime('%Y-%m-%d'): float(p) for d, p in prices.items()}
-                    db.cache_prices(ticker, price_dict)
-            else:
-                if 'Close' in data.columns.get_level_values(0):
-                    for ticker in batch:
-                        if ticker in data['Close'].columns:
-                            prices = data['Close'][ticker].dropna()
-                            if not prices.empty:
-                                all_prices[ticker] = prices
-                                # Cache prices
-                                price_dict = {d.strftime('%Y-%m-%d'): float(p) for d, p in prices.items()}
-                                db.cache_prices(ticker, price_dict)
-
-        except Exception as e:
-            print(f"    Error: {e}")
+    # Downloads are network-bound, so run several batches at once. Results are
+    # handled here on the calling thread, which keeps all SQLite writes serial.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_batch, batch): (n, batch)
+            for n, batch in enumerate(batches, 1)
+        }
+        for future in as_completed(futures):
+            n, batch = futures[future]
+            print(f"  Batch {n}: {len(batch)} tickers...")
+
+            try:
+                data = future.result()
+
+                if len(batch) == 1:
+                    if not data.empty:
+                        ticker = batch[0]
+                        prices = data['Close'].dropna().astype(PRICE_DTYPE)
+                        all_prices[ticker] = prices
+                        # Cache prices
+                        price_dict = {d.strftime('%Y-%m-%d'): float(p) for d, p in prices.items()}
+                        db.cache_prices(ticker, price_dict)
+                else:
+                    if 'Close' in data.columns.get_level_values(0):
+                        for ticker in batch:
+                            if ticker in data['Close'].columns:
+                                prices = data['Close'][ticker].dropna().astype(PRICE_DTYPE)
+                                if not prices.empty:
+                                    all_prices[ticker] = prices
+                                    # Cache prices
+                                    price_dict = {d.strftime('%Y-%m-%d'): float(p) for d, p in prices.items()}
+                                    db.cache_prices(ticker, price_dict)
+
+            except Exception as e:
+                print(f"    Error: {e}")
 
     print(f"  Cached prices for {len(all_prices)} tickers")
     return all_prices
 
 
-def get_prices_for_tickers(tickers: list[str], start_date: datetime) -> dict:
+def get_prices_for_tickers(
+    tickers: list[str],
+    start_date: datetime,
+    max_workers: Optional[int] = None
+) -> dict:
     """Get prices from cache or fetch from Yahoo Finance."""
     prices = {}
     tickers_to_fetch = []
 
     # Check cache first
+    cached = get_cached_price_series(tickers)
     for ticker in tickers:
-        cached = get_cached_price_df(ticker)
-        if not cached.empty and len(cached) > 10:
-            prices[ticker] = cached['close_price']
+        series = cached.get(ticker)
+        if series is not None and len(series) > 10:
+            prices[ticker] = series
         else:
             tickers_to_fetch.append(ticker)
 
@@ -128,203 +206,313 @@ def get_prices_for_tickers(tickers: list[str], start_date: datetime) -> dict:
 
     # Fetch missing tickers
     if tickers_to_fetch:
-        fetched = fetch_and_cache_prices(tickers_to_fetch, start_date)
+        fetched = fetch_and_cache_prices(tickers_to_fetch, start_date, max_workers=max_workers)
         prices.update(fetched)
 
     return prices
 
 
-def calculate_and_store_returns(trades_df: pd.DataFrame, prices: dict) -> pd.DataFrame:
+def build_price_matrix(prices: dict) -> pd.DataFrame:
+    """Combine {ticker: price_series} into one wide DataFrame (dates x tickers).
+
+    Dates on which a ticker has no price are left as NaN.
+    """
+    prices = {ticker: series for ticker, series in prices.items() if not series.empty}
+    if not prices:
+        return pd.DataFrame(dtype=PRICE_DTYPE)
+    return pd.concat(prices, axis=1).sort_index().astype(PRICE_DTYPE)
+
+
+def load_price_matrix_cache() -> pd.DataFrame:
+    """Read the price matrix side file if it was built today, else return an empty frame."""
+    path = config.CACHE_DIR / config.PRICE_MATRIX_CACHE_FILE
+    manifest_path = config.CACHE_DIR / config.PRICE_MATRIX_MANIFEST_FILE
+    empty = pd.DataFrame(dtype=PRICE_DTYPE)
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return empty
+    if manifest.get("built") != datetime.now().strftime('%Y-%m-%d') or not path.exists():
+        return empty
+    try:
+        price_mat = pd.read_feather(path)
+    except ImportError:
+        return empty
+    return price_mat.set_index('price_date')
+
+
+def save_price_matrix_cache(price_mat: pd.DataFrame) -> Optional[Path]:
+    """
+    Write the price matrix and its manifest to the cache directory.
+
+    Returns the path written, or None if feather support (pyarrow) is not
+    installed.
+    """
+    config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.CACHE_DIR / config.PRICE_MATRIX_CACHE_FILE
+    try:
+        price_mat.rename_axis('price_date').reset_index().to_feather(path)
+    except ImportError:
+        return None
+
+    last_dates = price_mat.apply(pd.Series.last_valid_index)
+    manifest = {
+        "built": datetime.now().strftime('%Y-%m-%d'),
+        "last_price_date": {ticker: date.strftime('%Y-%m-%d') for ticker, date in last_dates.items()},
+    }
+    (config.CACHE_DIR / config.PRICE_MATRIX_MANIFEST_FILE).write_text(json.dumps(manifest))
+    return path
+
+
+def get_price_matrix(
+    tickers: list[str],
+    start_date: datetime,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Get the wide price matrix for tickers.
+
+    Tickers in today's side file are read from it; the rest go through
+    get_prices_for_tickers and are added to the side file.
+    """
+    cached = load_price_matrix_cache()
+    hits = [t for t in tickers if t in cached.columns and cached[t].count() > 10]
+    hit_set = set(hits)
+    misses = [t for t in tickers if t not in hit_set]
+    if hits:
+        print(f"  {len(hits)} tickers from price matrix cache")
+
+    if misses:
+        fetched = build_price_matrix(get_prices_for_tickers(misses, start_date, max_workers=max_workers))
+        frames = [f for f in (cached.drop(columns=fetched.columns, errors='ignore'), fetched) if not f.empty]
+        if frames:
+            cached = pd.concat(frames, axis=1).sort_index().astype(PRICE_DTYPE)
+            save_price_matrix_cache(cached)
+
+    present = [t for t in tickers if t in cached.columns]
+    return cached[present].dropna(how='all')
+
+
+def calculate_and_store_returns(trades_df: pd.DataFrame, price_mat: pd.DataFrame) -> pd.DataFrame:
     """Calculate returns for each trade and store in database."""
-    results = []
-    today = datetime.now()
-    today_str = today.strftime('%Y-%m-%d')
-
-    for _, trade in trades_df.iterrows():
-        ticker = trade['ticker']
-        trade_date = trade['transaction_date']
-        tx_type = trade['transaction_type']
-        trade_id = int(trade['trade_id'])  # Convert numpy int64 to Python int
-
-        if ticker not in prices or prices[ticker].empty:
-            continue
-
-        price_series = prices[ticker]
-
-        try:
-            # Find entry price (nearest date on or after trade date)
-            available_dates = price_series.index
-            valid_dates = available_dates[available_dates >= trade_date]
-
-            if len(valid_dates) == 0:
-                continue
-
-            entry_date = valid_dates[0]
-            entry_price = float(price_series[entry_date])
-            entry_date_str = entry_date.strftime('%Y-%m-%d')
-
-            # 30-day return
-            target_date_30 = entry_date + timedelta(days=30)
-            valid_30 = available_dates[available_dates >= target_date_30]
-
-            return_30d = None
-            return_30d_date = None
-            if len(valid_30) > 0:
-                exit_date_30 = valid_30[0]
-                exit_price_30 = float(price_series[exit_date_30])
-                return_30d = (exit_price_30 - entry_price) / entry_price
-                return_30d_date = exit_date_30.strftime('%Y-%m-%d')
-
-            # Current return
-            if len(price_series) > 0:
-                current_price = float(price_series.iloc[-1])
-                return_current = (current_price - entry_price) / entry_price
-            else:
-                return_current = None
-
-            # Flip sign for sales
-            if tx_type == 'sale':
-                if return_30d is not None:
-                    return_30d = -return_30d
-                if return_current is not None:
-                    return_current = -return_current
-
-            # Store in database
-            db.upsert_trade_return(
-                trade_id=trade_id,
-                entry_date=entry_date_str,
-                entry_price=entry_price,
-                return_30d=return_30d,
-                return_30d_date=return_30d_date,
-                return_current=return_current,
-                return_current_date=today_str
-            )
-
-            results.append({
-                'trade_id': trade_id,
-                'member_id': trade['member_id'],
-                'member_name': trade['member_name'],
-                'chamber': trade['chamber'],
-                'party': trade['party'],
-                'ticker': ticker,
-                'transaction_type': tx_type,
-                'return_30d': return_30d,
-                'return_current': return_current,
-            })
-
-        except Exception:
-            continue
-
-    return pd.DataFrame(results)
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    empty = pd.DataFrame(columns=[
+        'trade_id', 'member_id', 'member_name', 'chamber', 'party',
+        'ticker', 'transaction_type', 'return_30d', 'return_current',
+    ])
+    if trades_df.empty or price_mat.empty:
+        return empty
+
+    dates = price_mat.index.to_numpy(dtype='datetime64[ns]')
+    values = price_mat.to_numpy()
+    n_rows = len(dates)
+
+    # For every (date, ticker) cell, the row of that ticker's next available
+    # price on or after the date (n_rows if there is none). Each lookup below
+    # is then one gather over all trades instead of a search per ticker.
+    has_price = ~np.isnan(values)
+    rows = np.arange(n_rows, dtype=np.int32)[:, None]
+    next_row = np.where(has_price, rows, n_rows).astype(np.int32)
+    next_row = np.minimum.accumulate(next_row[::-1], axis=0)[::-1]
+    last_row = n_rows - 1 - np.argmax(has_price[::-1], axis=0)
+
+    def next_price_row(target_dates: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        # Row of the first price on or after each target date, n_rows if none
+        idx = np.searchsorted(dates, target_dates, side='left')
+        found = idx < n_rows
+        result = np.full(len(idx), n_rows, dtype=np.int32)
+        result[found] = next_row[idx[found], cols[found]]
+        return result
+
+    cols = price_mat.columns.get_indexer(trades_df['ticker'])
+    in_matrix = cols >= 0
+    cols = np.where(in_matrix, cols, 0)
+    trade_dates = trades_df['transaction_date'].to_numpy(dtype='datetime64[ns]')
+
+    # Entry price (nearest date on or after trade date)
+    entry_row = np.where(in_matrix, next_price_row(trade_dates, cols), n_rows)
+    has_entry = entry_row < n_rows
+    entry_row = np.where(has_entry, entry_row, 0)
+    entry_prices = np.where(has_entry, values[entry_row, cols], np.nan).astype(float)
+    entry_dates = np.where(has_entry, dates[entry_row], np.datetime64('NaT'))
+
+    # 30-day exit price (nearest date on or after entry + 30 days)
+    exit_row = np.where(
+        has_entry, next_price_row(entry_dates + np.timedelta64(30, 'D'), cols), n_rows
+    )
+    has_exit = exit_row < n_rows
+    exit_row = np.where(has_exit, exit_row, 0)
+    exit_prices = np.where(has_exit, values[exit_row, cols], np.nan).astype(float)
+    exit_dates = np.where(has_exit, dates[exit_row], np.datetime64('NaT'))
+
+    current_prices = values[last_row[cols], cols].astype(float)
+
+    valid = ~np.isnan(entry_prices) & (entry_prices != 0)
+    if not valid.any():
+        return empty
+
+    entry_prices = entry_prices[valid]
+    return_30d = (exit_prices[valid] - entry_prices) / entry_prices
+    return_current = (current_prices[valid] - entry_prices) / entry_prices
+
+    # Flip sign for sales
+    tx_types = trades_df['transaction_type'].to_numpy()[valid]
+    sign = np.where(tx_types == 'sale', -1.0, 1.0)
+    return_30d *= sign
+    return_current *= sign
+
+    results = trades_df.loc[valid, [
+        'trade_id', 'member_id', 'member_name', 'chamber', 'party', 'ticker', 'transaction_type'
+    ]].reset_index(drop=True)
+    results['trade_id'] = results['trade_id'].astype(int)
+    results['return_30d'] = return_30d
+    results['return_current'] = return_current
+
+    entry_date_strs = pd.DatetimeIndex(entry_dates[valid]).strftime('%Y-%m-%d')
+    exit_date_strs = pd.DatetimeIndex(exit_dates[valid]).strftime('%Y-%m-%d')
+
+    # Store in database
+    has_exit = ~np.isnan(return_30d)
+    db.upsert_trade_returns_bulk([
+        (
+            int(trade_id),
+            entry_date_strs[i],
+            float(entry_prices[i]),
+            float(return_30d[i]) if has_exit[i] else None,
+            exit_date_strs[i] if has_exit[i] else None,
+            float(return_current[i]),
+            today_str,
+        )
+        for i, trade_id in enumerate(results['trade_id'])
+    ])
+
+    return results
+
+
+def _member_groups(returns_df: pd.DataFrame) -> tuple:
+    """Return (member_ids, order, starts) laying each member's rows out contiguously.
+
+    Members come in order of first appearance, as groupby(sort=False) would
+    give; returns[order] sliced at starts is one member per slice.
+    """
+    codes, member_ids = pd.factorize(returns_df['member_id'])
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return member_ids, order, starts
+
+
+def _member_return_stats(
+    returns_df: pd.DataFrame,
+    column: str,
+    risk_free: float,
+    groups: Optional[tuple] = None
+) -> pd.DataFrame:
+    """Per-member return statistics for one horizon, indexed by member_id.
+
+    Members with fewer than two valid returns get NaN for every statistic,
+    and sharpe_ratio is NaN when the standard deviation is zero. Pass groups
+    from _member_groups() to share the grouping across horizons.
+    """
+    # Contiguous per-member slices so every statistic is one reduceat
+    member_ids, order, starts = groups if groups is not None else _member_groups(returns_df)
+    returns = returns_df[column].to_numpy(dtype=float)[order]
+    sizes = np.diff(np.r_[starts, len(returns)])
+
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+    count = np.add.reduceat(valid.astype(float), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.add.reduceat(filled, starts) / count
+        deviation = np.where(valid, returns - np.repeat(mean, sizes), 0.0)
+        std = np.sqrt(np.add.reduceat(deviation ** 2, starts) / (count - 1))
+        win_rate = np.add.reduceat((filled > 0).astype(float), starts) / count
+    total_return = np.multiply.reduceat(np.where(valid, 1 + returns, 1.0), starts) - 1
+
+    stats = pd.DataFrame(
+        {'mean_return': mean, 'std_return': std, 'win_rate': win_rate, 'total_return': total_return},
+        index=pd.Index(member_ids, name='member_id'),
+    )
+    stats.loc[count < 2] = np.nan
+    stats['sharpe_ratio'] = ((stats['mean_return'] - risk_free) / stats['std_return']).where(stats['std_return'] > 0)
+    return stats
 
 
 def calculate_and_store_sharpe(returns_df: pd.DataFrame, snapshot_date: str) -> tuple:
     """Calculate Sharpe ratios and store snapshots. Returns (sharpe_30d_df, sharpe_current_df)."""
+    if returns_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
 
     rf_30d = RISK_FREE_RATE_DAILY * 30
     rf_annual = RISK_FREE_RATE_ANNUAL
 
-    results_30d = []
-    results_current = []
-
-    for member_id in returns_df['member_id'].unique():
-        member_id = int(member_id)  # Convert numpy int64 to Python int
-        member_data = returns_df[returns_df['member_id'] == member_id]
-        member_name = member_data['member_name'].iloc[0]
-        chamber = member_data['chamber'].iloc[0]
-        party = member_data['party'].iloc[0]
-
-        # 30-day Sharpe
-        valid_30d = member_data['return_30d'].dropna()
-        sharpe_30d = None
-        mean_30d = None
-        std_30d = None
-        win_rate_30d = None
-        total_return_30d = None
-
-        if len(valid_30d) >= 2:
-            mean_30d = float(valid_30d.mean())
-            std_30d = float(valid_30d.std())
-            if std_30d > 0:
-                sharpe_30d = (mean_30d - rf_30d) / std_30d
-            win_rate_30d = float((valid_30d > 0).mean())
-            total_return_30d = float((1 + valid_30d).prod() - 1)
-
-        # Current Sharpe
-        valid_current = member_data['return_current'].dropna()
-        sharpe_current = None
-        mean_current = None
-        std_current = None
-        win_rate_current = None
-        total_return_current = None
-
-        if len(valid_current) >= 2:
-            mean_current = float(valid_current.mean())
-            std_current = float(valid_current.std())
-            if std_current > 0:
-                sharpe_current = (mean_current - rf_annual) / std_current
-            win_rate_current = float((valid_current > 0).mean())
-            total_return_current = float((1 + valid_current).prod() - 1)
-
-        num_trades = len(member_data)
-
-        # Store snapshot
-        db.save_sharpe_snapshot(
-            member_id=member_id,
-            snapshot_date=snapshot_date,
-            sharpe_30d=sharpe_30d,
-            sharpe_current=sharpe_current,
-            num_trades=num_trades,
-            mean_return_30d=mean_30d,
-            std_return_30d=std_30d,
-            mean_return_current=mean_current,
-            std_return_current=std_current,
-            win_rate_30d=win_rate_30d,
-            win_rate_current=win_rate_current,
-            total_return_30d=total_return_30d,
-            total_return_current=total_return_current
+    members = returns_df.groupby('member_id', sort=False).agg(
+        member_name=('member_name', 'first'),
+        chamber=('chamber', 'first'),
+        party=('party', 'first'),
+        num_trades=('member_id', 'size'),
+    )
+    groups = _member_groups(returns_df)
+    stats_30d = _member_return_stats(returns_df, 'return_30d', rf_30d, groups)
+    stats_current = _member_return_stats(returns_df, 'return_current', rf_annual, groups)
+
+    columns = ['sharpe_ratio', 'mean_return', 'std_return', 'win_rate', 'total_return']
+    df_30d = members.join(stats_30d[columns]).reset_index()
+    df_current = members.join(stats_current[columns]).reset_index()
+
+    # Store snapshots (NaN -> NULL)
+    snapshot_rows = [
+        (
+            int(member_id), snapshot_date, s30.sharpe_ratio, sc.sharpe_ratio, int(num_trades),
+            s30.mean_return, s30.std_return, sc.mean_return, sc.std_return,
+            s30.win_rate, sc.win_rate, s30.total_return, sc.total_return
         )
-
-        results_30d.append({
-            'member_id': member_id,
-            'member_name': member_name,
-            'chamber': chamber,
-            'party': party,
-            'num_trades': num_trades,
-            'sharpe_ratio': sharpe_30d,
-            'mean_return': mean_30d,
-            'std_return': std_30d,
-            'win_rate': win_rate_30d,
-            'total_return': total_return_30d,
-        })
-
-        results_current.append({
-            'member_id': member_id,
-            'member_name': member_name,
-            'chamber': chamber,
-            'party': party,
-            'num_trades': num_trades,
-            'sharpe_ratio': sharpe_current,
-            'mean_return': mean_current,
-            'std_return': std_current,
-            'win_rate': win_rate_current,
-            'total_return': total_return_current,
-        })
-
-    df_30d = pd.DataFrame(results_30d)
-    df_current = pd.DataFrame(results_current)
+        for member_id, num_trades, s30, sc in zip(
+            members.index, members['num_trades'],
+            stats_30d.astype(object).where(stats_30d.notna(), None).itertuples(),
+            stats_current.astype(object).where(stats_current.notna(), None).itertuples(),
+        )
+    ]
+    db.save_sharpe_snapshots_bulk(snapshot_rows)
 
     # Sort by Sharpe ratio
-    if not df_30d.empty:
-        df_30d = df_30d.sort_values('sharpe_ratio', ascending=False, na_position='last')
-    if not df_current.empty:
-        df_current = df_current.sort_values('sharpe_ratio', ascending=False, na_position='last')
+    df_30d = df_30d.sort_values('sharpe_ratio', ascending=False, na_position='last')
+    df_current = df_current.sort_values('sharpe_ratio', ascending=False, na_position='last')
 
     return df_30d, df_current
 
 
-def run_analysis(verbose: bool = True) -> dict:
-    """Run full Sharpe ratio analysis and store results in database."""
+def save_rankings_cache(snapshot_date: str) -> Optional[Path]:
+    """
+    Write the latest Sharpe rankings to a parquet file for the dashboard.
+
+    Older rankings files are removed. Returns the path written, or None if
+    parquet support (pyarrow) is not installed.
+    """
+    rankings = pd.DataFrame(db.get_latest_sharpe_all_members())
+    config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.CACHE_DIR / config.RANKINGS_CACHE_FILE.format(snapshot_date=snapshot_date)
+    try:
+        rankings.to_parquet(path, index=False)
+    except ImportError:
+        return None
+
+    for old in config.CACHE_DIR.glob(config.RANKINGS_CACHE_FILE.format(snapshot_date="*")):
+        if old != path:
+            old.unlink()
+    return path
+
+
+def run_analysis(
+    verbose: bool = True,
+    incremental: bool = False,
+    max_workers: Optional[int] = None
+) -> dict:
+    """Run full Sharpe ratio analysis and store results in database.
+
+    With incremental=True, returns are only recalculated for trades that need
+    it (see get_trades_for_analysis) and Sharpe ratios use all stored returns.
+    """
 
     if verbose:
         print("=" * 60)
@@ -335,45 +523,55 @@ def run_analysis(verbose: bool = True) -> dict:
     # Get trades
     if verbose:
         print("Loading trades from database...")
-    trades = get_trades_for_analysis()
+    trades = get_trades_for_analysis(incremental=incremental)
     if verbose:
-        print(f"  Found {len(trades)} trades with tickers")
+        print(f"  Found {len(trades)} trades {'needing returns' if incremental else 'with tickers'}")
 
-    if trades.empty:
+    if trades.empty and not incremental:
         print("No trades to analyze.")
         return {"error": "No trades"}
 
-    # Get unique tickers
-    tickers = trades['ticker'].unique().tolist()
-    if verbose:
-        print(f"  Unique tickers: {len(tickers)}")
-
-    # Get date range
-    min_date = trades['transaction_date'].min() - timedelta(days=5)
-    if verbose:
-        print(f"  Date range: {min_date.strftime('%Y-%m-%d')} to present")
-        print()
-
-    # Get prices (from cache or fetch)
-    if verbose:
-        print("Getting stock prices...")
-    prices = get_prices_for_tickers(tickers, min_date)
-    if verbose:
-        print()
-
-    # Calculate and store returns
-    if verbose:
-        print("Calculating and storing returns...")
-    returns_df = calculate_and_store_returns(trades, prices)
-    if verbose:
-        print(f"  Calculated returns for {len(returns_df)} trades")
-        print()
+    if trades.empty:
+        if verbose:
+            print("  All stored returns are up to date")
+            print()
+    else:
+        # Get unique tickers
+        tickers = trades['ticker'].unique().tolist()
+        if verbose:
+            print(f"  Unique tickers: {len(tickers)}")
+
+        # Get date range
+        min_date = trades['transaction_date'].min() - timedelta(days=5)
+        if verbose:
+            print(f"  Date range: {min_date.strftime('%Y-%m-%d')} to present")
+            print()
+
+        # Get prices (from cache or fetch)
+        if verbose:
+            print("Getting stock prices...")
+        price_mat = get_price_matrix(tickers, min_date, max_workers=max_workers)
+        if verbose:
+            print()
+
+        # Calculate and store returns
+        if verbose:
+            print("Calculating and storing returns...")
+        returns_df = calculate_and_store_returns(trades, price_mat)
+        if verbose:
+            print(f"  Calculated returns for {len(returns_df)} trades")
+            print()
+
+    if incremental:
+        # Sharpe ratios cover every stored return, not just this run's
+        returns_df = get_stored_returns()
 
     # Calculate and store Sharpe ratios
     snapshot_date = datetime.now().strftime('%Y-%m-%d')
     if verbose:
         print(f"Calculating Sharpe ratios (snapshot: {snapshot_date})...")
     sharpe_30d, sharpe_current = calculate_and_store_sharpe(returns_df, snapshot_date)
+    save_rankings_cache(snapshot_date)
     if verbose:
         print(f"  Stored snapshots for {len(sharpe_30d)} members")
         print()
@@ -426,9 +624,11 @@ def get_member_sharpe_history(member_name: str) -> pd.DataFrame:
         # Try partial match
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM members WHERE name LIKE ?", (f"%{member_name}%",))
+        cursor.execute(
+            "SELECT rowid AS id, name FROM members_fts WHERE name LIKE ?",
+            (f"%{member_name}%",)
+        )
         row = cursor.fetchone()
-        conn.close()
         if row:
             member_id = row["id"]
         else:
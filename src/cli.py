@@ -5,25 +5,75 @@ Command-line interface for Congress Trades Tracker.
 import argparse
 import sys
 from datetime import datetime
+from itertools import chain, islice
+from typing import Iterator
 
 from . import config
 from . import db
-from . import scraper
 from . import notify
-from . import analysis
+
+# scraper and analysis (pandas, numpy, yfinance) are imported inside the
+# commands that use them, so status/recent/search start quickly.
+
+
+# One line per trade in recent/search output; precision truncates long fields
+_TRADE_ROW_FMT = "{date} | {member:<20.20} ({chamber}) | {ticker:<6.6} | {tx_type:<8.8} | {amount:.20}"
+
+
+def write_trade_rows(trades: Iterator[tuple], chunk_size: int = 500) -> tuple:
+    """
+    Write streamed trade rows to stdout, one write per chunk_size lines.
+
+    Returns (rows written, last row).
+    """
+    count, last = 0, None
+    while True:
+        chunk = list(islice(trades, chunk_size))
+        if not chunk:
+            return count, last
+        sys.stdout.write("\n".join(
+            _TRADE_ROW_FMT.format(
+                date=date,
+                member=member,
+                chamber=chamber[0].upper(),
+                ticker=ticker or "N/A",
+                tx_type=tx_type,
+                amount=amount or "Unknown",
+            )
+            for date, member, chamber, ticker, tx_type, amount, _, _ in chunk
+        ) + "\n")
+        count += len(chunk)
+        last = chunk[-1]
+
+
+def parse_cursor(value: str, num_keys: int) -> tuple:
+    """Parse an --after cursor ("<key>,...,<id>") into a keyset tuple."""
+    parts = value.split(",")
+    if len(parts) != num_keys:
+        raise ValueError(f"expected {num_keys} comma-separated values, got '{value}'")
+    *keys, trade_id = parts
+    return (*keys, int(trade_id))
 
 
 def cmd_sync(args):
     """Sync trades from APIs."""
+    from . import scraper
+
     print(f"Congress Trades Sync - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
 
+    daily_digest = config.DAILY_DIGEST
+
     # Determine notification callback
     notify_callback = None
     if args.notify:
-        if config.DAILY_DIGEST:
+        if daily_digest:
             # Collect trades, send digest at end
             notify_callback = None  # Handle separately
+        elif notify.is_quiet_hours():
+            # Decided once for the whole sync rather than per trade
+            print(f"Skipping notifications (quiet hours: "
+                  f"{config.NOTIFY_HOURS[0]}:00 - {config.NOTIFY_HOURS[1]}:00)")
         else:
             notify_callback = notify.notify_new_trade
 
@@ -31,20 +81,26 @@ def cmd_sync(args):
     lookback = args.days if args.days else None
     result = scraper.sync_trades(
         lookback_days=lookback,
-        notify_callback=notify_callback
+        notify_callback=notify_callback,
+        max_workers=args.concurrency,
+        conditional=True
     )
 
     # Send daily digest if configured
-    if args.notify and config.DAILY_DIGEST and result["trades"]:
+    if args.notify and daily_digest and result["trades"]:
         notify.notify_daily_digest(result["trades"])
 
     # Run Sharpe analysis if requested
     if args.analyze:
+        from . import analysis
+
         print()
         print("=" * 50)
         print("Running Sharpe ratio analysis...")
         print("=" * 50)
-        analysis.run_analysis(verbose=False)
+        # Just-synced trades have no returns yet, so the incremental pass covers
+        # them along with every trade whose current return is stale
+        analysis.run_analysis(verbose=False, incremental=True, max_workers=args.concurrency)
         print("Sharpe ratios updated.")
 
     return 0 if result["new_trades"] >= 0 else 1
@@ -52,6 +108,8 @@ def cmd_sync(args):
 
 def cmd_init(args):
     """Initialize database and do initial data load."""
+    from . import scraper
+
     print("Initializing Congress Trades database...")
     print(f"Data directory: {config.DATA_DIR}")
     print(f"Database: {config.DB_PATH}")
@@ -109,63 +167,65 @@ def cmd_status(args):
 def cmd_recent(args):
     """Show recent trades."""
     db.init_db()
-    trades = db.get_recent_trades(days=args.days, limit=args.limit)
+    try:
+        after = parse_cursor(args.after, 3) if args.after else None
+    except ValueError as e:
+        print(f"Error: invalid --after cursor: {e}")
+        return 1
+    trades = db.get_recent_trades(days=args.days, limit=args.limit, after=after, stream=True)
 
-    if not trades:
+    first = next(trades, None)
+    if first is None:
         print(f"No trades found in the last {args.days} days.")
         return 0
 
     print(f"Recent trades (last {args.days} days)")
     print("=" * 80)
 
-    for trade in trades:
-        date = trade["transaction_date"]
-        member = trade["member_name"][:20].ljust(20)
-        chamber = trade["chamber"][0].upper()
-        ticker = (trade["ticker"] or "N/A")[:6].ljust(6)
-        tx_type = trade["transaction_type"][:8].ljust(8)
-        amount = trade["amount_range"][:20] if trade["amount_range"] else "Unknown"
-
-        print(f"{date} | {member} ({chamber}) | {ticker} | {tx_type} | {amount}")
+    count, last = write_trade_rows(chain([first], trades))
 
     print()
-    print(f"Showing {len(trades)} trades")
+    print(f"Showing {count} trades")
+    if count == args.limit:
+        date, *_, disclosure_date, trade_id = last
+        print(f"Next page: --after {disclosure_date},{date},{trade_id}")
     return 0
 
 
 def cmd_search(args):
     """Search trades by ticker or member."""
     db.init_db()
+    try:
+        after = parse_cursor(args.after, 2) if args.after else None
+    except ValueError as e:
+        print(f"Error: invalid --after cursor: {e}")
+        return 1
 
     if args.ticker:
-        trades = db.get_trades_by_ticker(args.ticker, limit=args.limit)
+        trades = db.get_trades_by_ticker(args.ticker, limit=args.limit, after=after, stream=True)
         title = f"Trades for ${args.ticker.upper()}"
     elif args.member:
-        trades = db.get_trades_by_member(args.member, limit=args.limit)
+        trades = db.get_trades_by_member(args.member, limit=args.limit, after=after, stream=True)
         title = f"Trades by members matching '{args.member}'"
     else:
         print("Error: Specify --ticker or --member")
         return 1
 
-    if not trades:
+    first = next(trades, None)
+    if first is None:
         print(f"No trades found.")
         return 0
 
     print(title)
     print("=" * 80)
 
-    for trade in trades:
-        date = trade["transaction_date"]
-        member = trade["member_name"][:20].ljust(20)
-        chamber = trade["chamber"][0].upper()
-        ticker = (trade["ticker"] or "N/A")[:6].ljust(6)
-        tx_type = trade["transaction_type"][:8].ljust(8)
-        amount = trade["amount_range"][:20] if trade["amount_range"] else "Unknown"
-
-        print(f"{date} | {member} ({chamber}) | {ticker} | {tx_type} | {amount}")
+    count, last = write_trade_rows(chain([first], trades))
 
     print()
-    print(f"Showing {len(trades)} trades")
+    print(f"Showing {count} trades")
+    if count == args.limit:
+        date, *_, trade_id = last
+        print(f"Next page: --after {date},{trade_id}")
     return 0
 
 
@@ -186,7 +246,12 @@ def cmd_test_notify(args):
 
 def cmd_analyze(args):
     """Run Sharpe ratio analysis."""
-    result = analysis.run_analysis(verbose=True)
+    from . import analysis
+
+    db.init_db()
+    result = analysis.run_analysis(
+        verbose=True, incremental=args.incremental, max_workers=args.concurrency
+    )
     if "error" in result:
         return 1
     return 0
@@ -198,6 +263,8 @@ def cmd_sharpe(args):
 
     if args.member:
         # Show history for a specific member
+        from . import analysis
+
         history = analysis.get_member_sharpe_history(args.member)
         if history.empty:
             print(f"No Sharpe history found for '{args.member}'")
@@ -217,7 +284,7 @@ def cmd_sharpe(args):
             print(f"{row['snapshot_date']:<12} {s30_str} {sc_str} {row['num_trades']:>8} {wr_str}")
     else:
         # Show latest rankings
-        rankings = db.get_latest_sharpe_all_members()
+        rankings = db.get_latest_sharpe_all_members(limit=args.limit)
         if not rankings:
             print("No Sharpe data found. Run 'python main.py analyze' first.")
             return 1
@@ -226,18 +293,36 @@ def cmd_sharpe(args):
         print("=" * 70)
         print(f"{'Rank':<5} {'Member':<25} {'Chamber':<8} {'30d Sharpe':>12} {'Win%':>8}")
         print("-" * 70)
-        for i, row in enumerate(rankings[:args.limit], 1):
+        lines = []
+        for i, row in enumerate(rankings, 1):
             s30 = row['sharpe_30d']
             s30_str = f"{s30:>12.3f}" if s30 is not None and abs(s30) < 1000 else "         N/A"
             wr = row['win_rate_30d']
             wr_str = f"{wr*100:>7.1f}%" if wr is not None else "     N/A"
-            print(f"{i:<5} {row['member_name'][:24]:<25} {row['chamber']:<8} {s30_str} {wr_str}")
+            lines.append(f"{i:<5} {row['member_name'][:24]:<25} {row['chamber']:<8} {s30_str} {wr_str}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     return 0
 
 
 def main():
     """Main entry point."""
+    commands = {
+        "init": cmd_init,
+        "sync": cmd_sync,
+        "status": cmd_status,
+        "recent": cmd_recent,
+        "search": cmd_search,
+        "test-notify": cmd_test_notify,
+        "analyze": cmd_analyze,
+        "sharpe": cmd_sharpe,
+    }
+
+    # Commands without options don't need the parser tree built
+    argv = sys.argv[1:]
+    if len(argv) == 1 and argv[0] in ("status", "test-notify"):
+        return commands[argv[0]](argparse.Namespace(command=argv[0]))
+
     parser = argparse.ArgumentParser(
         description="Track congressional stock trades",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -254,6 +339,7 @@ def main():
     sync_parser.add_argument("--days", type=int, default=7, help="Only fetch trades from last N days (default: 7)")
     sync_parser.add_argument("--notify", action="store_true", help="Send push notifications for new trades")
     sync_parser.add_argument("--analyze", action="store_true", help="Run Sharpe ratio analysis after sync")
+    sync_parser.add_argument("--concurrency", type=int, default=config.FETCH_WORKERS, help=f"Concurrent HTTP requests (default: {config.FETCH_WORKERS})")
 
     # status command
     subparsers.add_parser("status", help="Show database status")
@@ -262,18 +348,22 @@ def main():
     recent_parser = subparsers.add_parser("recent", help="Show recent trades")
     recent_parser.add_argument("--days", type=int, default=7, help="Number of days (default: 7)")
     recent_parser.add_argument("--limit", type=int, default=50, help="Max trades to show (default: 50)")
+    recent_parser.add_argument("--after", type=str, help="Show the page after this cursor (printed after each full page)")
 
     # search command
     search_parser = subparsers.add_parser("search", help="Search trades")
     search_parser.add_argument("--ticker", type=str, help="Search by ticker symbol")
     search_parser.add_argument("--member", type=str, help="Search by member name")
     search_parser.add_argument("--limit", type=int, default=50, help="Max trades to show (default: 50)")
+    search_parser.add_argument("--after", type=str, help="Show the page after this cursor (printed after each full page)")
 
     # test-notify command
     subparsers.add_parser("test-notify", help="Send a test notification")
 
     # analyze command
-    subparsers.add_parser("analyze", help="Run Sharpe ratio analysis (fetches prices, calculates returns)")
+    analyze_parser = subparsers.add_parser("analyze", help="Run Sharpe ratio analysis (fetches prices, calculates returns)")
+    analyze_parser.add_argument("--incremental", action="store_true", help="Only recalculate returns for new or stale trades")
+    analyze_parser.add_argument("--concurrency", type=int, default=config.FETCH_WORKERS, help=f"Concurrent price requests (default: {config.FETCH_WORKERS})")
 
     # sharpe command
     sharpe_parser = subparsers.add_parser("sharpe", help="Show Sharpe ratio rankings or history")
@@ -286,17 +376,6 @@ def main():
         parser.print_help()
         return 1
 
-    commands = {
-        "init": cmd_init,
-        "sync": cmd_sync,
-        "status": cmd_status,
-        "recent": cmd_recent,
-        "search": cmd_search,
-        "test-notify": cmd_test_notify,
-        "analyze": cmd_analyze,
-        "sharpe": cmd_sharpe,
-    }
-
     return commands[args.command](args)
 
 
@@ -8,8 +8,12 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load .env file from project root
-load_dotenv(Path(__file__).parent.parent / ".env")
+# Settings read from the environment (or the .env file)
+ENV_SETTINGS = ("FMP_API_KEY", "NTFY_TOPIC")
+
+# Load .env file from project root, unless the environment already has them all
+if not all(key in os.environ for key in ENV_SETTINGS):
+    load_dotenv(Path(__file__).parent.parent / ".env")
 
 # =============================================================================
 # FMP API (Financial Modeling Prep)
@@ -32,6 +36,7 @@ NTFY_SERVER = "https://ntfy.sh"  # Default public server (or self-host)
 NOTIFY_ON_NEW_TRADES = True  # Send notification for each new trade
 DAILY_DIGEST = False  # Send a single daily summary instead of individual notifications
 NOTIFY_HOURS = (7, 22)  # Only send notifications between these hours (24h format)
+NOTIFY_WORKERS = 4  # Notifications sent concurrently after a sync
 
 # =============================================================================
 # WATCHLIST (Optional)
@@ -58,10 +63,19 @@ PROJECT_DIR = Path(__file__).parent.parent
 DATA_DIR = PROJECT_DIR / "data"
 DB_PATH = DATA_DIR / "trades.db"
 
+# Derived files rebuilt by `analyze` (safe to delete)
+CACHE_DIR = DATA_DIR / "cache"
+RANKINGS_CACHE_FILE = "rankings_{snapshot_date}.parquet"
+PRICE_MATRIX_CACHE_FILE = "price_mat.feather"
+PRICE_MATRIX_MANIFEST_FILE = "price_mat.json"  # build date + last price date per ticker
+
 # Data source: Capitol Trades (scraped)
 CAPITOL_TRADES_URL = "https://www.capitoltrades.com/trades"
 TRADES_PER_PAGE = 12
 
+# Concurrent HTTP requests when fetching trade pages and price batches
+FETCH_WORKERS = 8
+
 # How far back to fetch on initial load (days)
 INITIAL_LOOKBACK_DAYS = 365 * 5  # 5 years
 
@@ -4,27 +4,104 @@ Database operations for Congress Trades Tracker.
 Uses SQLite for local storage - no external database needed.
 """
 
+import atexit
 import sqlite3
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Union
 
 from . import config
 
+# Rows pulled per fetchmany() when streaming results. Big enough to amortize the
+# per-call overhead, small enough to keep a bounded number of rows in memory.
+FETCH_BATCH_SIZE = 200
+
+# Compiled statements kept per connection, keyed by SQL text. Hot statements
+# are module-level constants so every call reuses the same compiled statement.
+STATEMENT_CACHE_SIZE = 256
+
+
+_local = threading.local()
+
 
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection, creating the database if needed."""
-    config.DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Get this thread's database connection, creating the database if needed.
+
+    The connection is opened and tuned once per thread and shared by every
+    helper, so SQLite keeps its page cache between calls. Don't close it;
+    use close_connection().
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        config.DATA_DIR.mkdir(parents=True, exist_ok=True)
+        # Autocommit: reads and one-shot writes run without a BEGIN/COMMIT from
+        # the sqlite3 module; multi-statement writes use _transaction()
+        conn = sqlite3.connect(
+            config.DB_PATH, cached_statements=STATEMENT_CACHE_SIZE, isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        # WAL is persistent per database file; readers no longer block the writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Safe with WAL: a crash can lose the last commit but never corrupts the db
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped reads
+        _local.conn = conn
     return conn
 
 
+def close_connection() -> None:
+    """Close this thread's connection; the next get_connection() reopens it."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        try:
+            # Refresh planner statistics the queries on this connection would use
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        conn.close()
+
+
+atexit.register(close_connection)
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run a write burst as one BEGIN IMMEDIATE ... COMMIT, rolling back on error."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# The trades UNIQUE constraint treats NULLs as distinct, so trades without a
+# ticker or owner were never deduplicated; this key compares them as ''.
+_TRADE_DEDUP_KEY = """
+    member_id, transaction_date, IFNULL(ticker, ''), asset_description,
+    transaction_type, amount_range, IFNULL(owner, '')
+"""
+
+_FIRST_TRADE_PER_KEY_SQL = f"SELECT MIN(id) FROM trades GROUP BY {_TRADE_DEDUP_KEY}"
+
+
 def init_db() -> None:
     """Initialize the database schema."""
     conn = get_connection()
     cursor = conn.cursor()
 
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'members_fts'")
+    has_members_fts = cursor.fetchone() is not None
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_trades_dedup'")
+    has_trades_dedup = cursor.fetchone() is not None
+
     cursor.executescript("""
         CREATE TABLE IF NOT EXISTS members (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -64,13 +141,34 @@ def init_db() -> None:
             status TEXT DEFAULT 'running'  -- 'running', 'completed', 'failed'
         );
 
+        -- Validators from the last response per URL, for conditional requests;
+        -- scope records the settings of the sync that saved them
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            scope TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
         CREATE INDEX IF NOT EXISTS idx_trades_ticker ON trades(ticker);
+        -- Case-insensitive ticker search, already in (transaction_date, id) order
+        CREATE INDEX IF NOT EXISTS idx_trades_ticker_nocase ON trades(ticker COLLATE NOCASE, transaction_date);
+        -- Entries end in the rowid (id), so this also serves (transaction_date, id) keyset pages
         CREATE INDEX IF NOT EXISTS idx_trades_transaction_date ON trades(transaction_date);
-        CREATE INDEX IF NOT EXISTS idx_trades_disclosure_date ON trades(disclosure_date);
+        -- Matches get_recent_trades' ORDER BY (id is the rowid suffix), so LIMIT reads
+        -- only the first index entries; it also serves the disclosure_date counts
+        CREATE INDEX IF NOT EXISTS idx_trades_disclosure_trans ON trades(disclosure_date, transaction_date);
+        DROP INDEX IF EXISTS idx_trades_disclosure_date;
         CREATE INDEX IF NOT EXISTS idx_trades_member ON trades(member_id);
+        CREATE INDEX IF NOT EXISTS idx_trades_member_date ON trades(member_id, transaction_date DESC);
+        -- Predicate matches the returns queries' WHERE clause verbatim so the planner can use it
+        CREATE INDEX IF NOT EXISTS idx_trades_needing_returns ON trades(transaction_type, ticker)
+            WHERE ticker IS NOT NULL AND ticker != '' AND transaction_type IN ('purchase', 'sale');
         CREATE INDEX IF NOT EXISTS idx_members_name ON members(name);
 
-        -- Price cache for stock prices
+        -- Price cache for stock prices.
+        -- UNIQUE(ticker, price_date) doubles as the (ticker, price_date) lookup index.
         CREATE TABLE IF NOT EXISTS price_cache (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             ticker TEXT NOT NULL,
@@ -114,15 +212,87 @@ def init_db() -> None:
             UNIQUE(member_id, snapshot_date)
         );
 
+        -- Latest snapshot per member, rebuilt at the end of each analysis run
+        -- so the rankings views read a flat table instead of re-aggregating
+        CREATE TABLE IF NOT EXISTS member_sharpe_latest (
+            member_id INTEGER PRIMARY KEY REFERENCES members(id),
+            snapshot_id INTEGER REFERENCES sharpe_snapshots(id),
+            snapshot_date DATE NOT NULL,
+            sharpe_30d REAL,
+            sharpe_current REAL,
+            num_trades INTEGER NOT NULL,
+            mean_return_30d REAL,
+            std_return_30d REAL,
+            mean_return_current REAL,
+            std_return_current REAL,
+            win_rate_30d REAL,
+            win_rate_current REAL,
+            total_return_30d REAL,
+            total_return_current REAL,
+            member_name TEXT NOT NULL,
+            chamber TEXT NOT NULL,
+            party TEXT
+        );
+
         CREATE INDEX IF NOT EXISTS idx_price_cache_ticker ON price_cache(ticker);
         CREATE INDEX IF NOT EXISTS idx_price_cache_date ON price_cache(price_date);
         CREATE INDEX IF NOT EXISTS idx_trade_returns_trade ON trade_returns(trade_id);
-        CREATE INDEX IF NOT EXISTS idx_sharpe_snapshots_member ON sharpe_snapshots(member_id);
+        -- UNIQUE(member_id, snapshot_date) already indexes per-member history in date
+        -- order, so a member_id-only index would just be extra write work
+        DROP INDEX IF EXISTS idx_sharpe_snapshots_member;
         CREATE INDEX IF NOT EXISTS idx_sharpe_snapshots_date ON sharpe_snapshots(snapshot_date);
+        CREATE INDEX IF NOT EXISTS idx_member_sharpe_latest_sharpe ON member_sharpe_latest(sharpe_30d DESC);
+
+        -- Trigram index over member names so LIKE '%name%' searches avoid a table scan
+        CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+            name, content='members', content_rowid='id', tokenize='trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS members_fts_ai AFTER INSERT ON members BEGIN
+            INSERT INTO members_fts (rowid, name) VALUES (new.id, new.name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS members_fts_ad AFTER DELETE ON members BEGIN
+            INSERT INTO members_fts (members_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS members_fts_au AFTER UPDATE OF name ON members BEGIN
+            INSERT INTO members_fts (members_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO members_fts (rowid, name) VALUES (new.id, new.name);
+        END;
     """)
 
-    conn.commit()
-    conn.close()
+    # Index members added before members_fts existed
+    if not has_members_fts:
+        cursor.execute("INSERT INTO members_fts (members_fts) VALUES ('rebuild')")
+
+    # Drop the repeats that slipped past it before adding the dedup index
+    if not has_trades_dedup:
+        with _transaction(conn):
+            cursor.execute(f"""
+                DELETE FROM trade_returns WHERE trade_id IN (
+                    SELECT id FROM trades WHERE id NOT IN ({_FIRST_TRADE_PER_KEY_SQL})
+                )
+            """)
+            cursor.execute(f"DELETE FROM trades WHERE id NOT IN ({_FIRST_TRADE_PER_KEY_SQL})")
+            cursor.execute(f"CREATE UNIQUE INDEX idx_trades_dedup ON trades({_TRADE_DEDUP_KEY})")
+
+    # Backfill databases analyzed before member_sharpe_latest existed
+    cursor.execute("SELECT 1 FROM member_sharpe_latest LIMIT 1")
+    if cursor.fetchone() is None:
+        with _transaction(conn):
+            _refresh_member_sharpe_latest(conn)
+
+
+_UPSERT_MEMBER_SQL = """
+    INSERT INTO members (name, chamber, party, state, district)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (name, chamber) DO UPDATE SET
+        party = COALESCE(excluded.party, members.party),
+        state = COALESCE(excluded.state, members.state),
+        district = COALESCE(excluded.district, members.district)
+    RETURNING id
+"""
 
 
 def get_or_create_member(
@@ -134,37 +304,40 @@ def get_or_create_member(
 ) -> int:
     """Get existing member ID or create new member, return ID."""
     conn = get_connection()
-    cursor = conn.cursor()
+    # Insert, or fill in party/state/district on the existing row. fetchall()
+    # runs the statement to completion so its autocommit ends here.
+    rows = conn.execute(
+        _UPSERT_MEMBER_SQL, (name, chamber, party, state, district)
+    ).fetchall()
+    return rows[0]["id"]
 
-    # Try to find existing member
-    cursor.execute(
-        "SELECT id FROM members WHERE name = ? AND chamber = ?",
-        (name, chamber)
-    )
-    row = cursor.fetchone()
 
-    if row:
-        member_id = row["id"]
-        # Update party/state/district if provided and different
-        if party or state or district:
-            cursor.execute("""
-                UPDATE members
-                SET party = COALESCE(?, party),
-                    state = COALESCE(?, state),
-                    district = COALESCE(?, district)
-                WHERE id = ?
-            """, (party, state, district, member_id))
-            conn.commit()
-    else:
-        cursor.execute("""
-            INSERT INTO members (name, chamber, party, state, district)
-            VALUES (?, ?, ?, ?, ?)
-        """, (name, chamber, party, state, district))
-        conn.commit()
-        member_id = cursor.lastrowid
-
-    conn.close()
-    return member_id
+def get_or_create_members_bulk(members: list[tuple]) -> list[int]:
+    """
+    Get or create many members in a single transaction.
+
+    Each member is (name, chamber, party, state, district), as for
+    get_or_create_member. Returns the member ID for each, in order.
+    """
+    if not members:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor()
+    member_ids = []
+    # RETURNING needs one statement per member, but there is a single commit
+    with _transaction(conn):
+        for member in members:
+            member_ids.append(cursor.execute(_UPSERT_MEMBER_SQL, member).fetchall()[0]["id"])
+    return member_ids
+
+
+_INSERT_TRADE_OR_IGNORE_SQL = """
+    INSERT OR IGNORE INTO trades (
+        member_id, transaction_date, disclosure_date, ticker,
+        asset_description, asset_type, transaction_type, amount_range,
+        owner, comment, source_url, cap_gains_over_200
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
 
 def insert_trade(
@@ -187,99 +360,185 @@ def insert_trade(
     """
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.execute(_INSERT_TRADE_OR_IGNORE_SQL, (
+        member_id, transaction_date, disclosure_date, ticker,
+        asset_description, asset_type, transaction_type, amount_range,
+        owner, comment, source_url, cap_gains_over_200
+    ))
+    # Duplicates are skipped by OR IGNORE and change no rows
+    return cursor.lastrowid if cursor.rowcount == 1 else None
 
-    try:
-        cursor.execute("""
-            INSERT INTO trades (
-                member_id, transaction_date, disclosure_date, ticker,
-                asset_description, asset_type, transaction_type, amount_range,
-                owner, comment, source_url, cap_gains_over_200
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            member_id, transaction_date, disclosure_date, ticker,
-            asset_description, asset_type, transaction_type, amount_range,
-            owner, comment, source_url, cap_gains_over_200
-        ))
-        conn.commit()
-        trade_id = cursor.lastrowid
-        conn.close()
-        return trade_id
-    except sqlite3.IntegrityError:
-        # Duplicate trade
-        conn.close()
-        return None
 
+def insert_trades_bulk(rows: list[tuple]) -> list[Optional[int]]:
+    """
+    Insert many trades in a single transaction, skipping duplicates.
 
-def get_recent_trades(days: int = 7, limit: int = 100) -> list[dict]:
-    """Get trades from the last N days."""
+    Each row follows the insert_trade argument order. Returns the new trade ID
+    for each row, or None where the row was a duplicate.
+    """
+    if not rows:
+        return []
     conn = get_connection()
     cursor = conn.cursor()
+    trade_ids = []
+    # One statement per row (executemany can't report which rows were
+    # ignored), but a single commit for the whole batch
+    with _transaction(conn):
+        for row in rows:
+            cursor.execute(_INSERT_TRADE_OR_IGNORE_SQL, row)
+            trade_ids.append(cursor.lastrowid if cursor.rowcount == 1 else None)
+    return trade_ids
+
+
+# Columns returned by the trade listing queries
+_TRADE_SELECT = "t.*, m.name as member_name, m.chamber, m.party, m.state"
+
+# Fixed column order for stream=True (CLI listings unpack these positionally):
+# (transaction_date, member_name, chamber, ticker, transaction_type,
+#  amount_range, disclosure_date, id)
+_TRADE_LISTING_SELECT = (
+    "t.transaction_date, m.name, m.chamber, t.ticker, "
+    "t.transaction_type, t.amount_range, t.disclosure_date, t.id"
+)
+
+
+def _stream_rows(
+    sql: str,
+    params: tuple,
+    conn: Optional[sqlite3.Connection] = None
+) -> Iterator[tuple]:
+    """Yield plain tuples straight from the cursor, FETCH_BATCH_SIZE rows per fetch."""
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.arraysize = FETCH_BATCH_SIZE
+    cursor.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield from rows
+
+
+def _fetch_dicts(
+    sql: str,
+    params: tuple,
+    conn: Optional[sqlite3.Connection] = None
+) -> list[dict]:
+    """Run a query and return every row as a dict."""
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    # Column names taken once from the cursor, not rebuilt per sqlite3.Row
+    keys = [d[0] for d in cursor.description]
+    return [dict(zip(keys, row)) for row in rows]
 
-    cursor.execute("""
-        SELECT
-            t.*,
-            m.name as member_name,
-            m.chamber,
-            m.party,
-            m.state
-        FROM trades t
-        JOIN members m ON t.member_id = m.id
-        WHERE t.disclosure_date >= date('now', ?)
-        ORDER BY t.disclosure_date DESC, t.transaction_date DESC
-        LIMIT ?
-    """, (f"-{days} days", limit))
 
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+def _days_ago(days: int) -> str:
+    """ISO date `days` days before today (UTC, as SQLite's date('now') uses)."""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
 
 
-def get_trades_by_ticker(ticker: str, limit: int = 100) -> list[dict]:
-    """Get all trades for a specific ticker."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def get_recent_trades(
+    days: int = 7,
+    limit: int = 100,
+    after: Optional[tuple] = None,
+    stream: bool = False,
+    conn: Optional[sqlite3.Connection] = None
+) -> Union[list[dict], Iterator[tuple]]:
+    """
+    Get trades from the last N days.
 
-    cursor.execute("""
-        SELECT
-            t.*,
-            m.name as member_name,
-            m.chamber,
-            m.party,
-            m.state
+    Pass after=(disclosure_date, transaction_date, id) of the last row of a
+    page to get the next page. stream=True yields plain tuples (see
+    _TRADE_LISTING_SELECT) as SQLite produces them instead of a list of dicts.
+    """
+    keyset = ""
+    params = [_days_ago(days)]
+    if after:
+        keyset = "AND (t.disclosure_date, t.transaction_date, t.id) < (?, ?, ?)"
+        params.extend(after)
+
+    sql = f"""
+        SELECT {_TRADE_LISTING_SELECT if stream else _TRADE_SELECT}
         FROM trades t
         JOIN members m ON t.member_id = m.id
-        WHERE UPPER(t.ticker) = UPPER(?)
-        ORDER BY t.transaction_date DESC
+        WHERE t.disclosure_date >= ?
+          {keyset}
+        ORDER BY t.disclosure_date DESC, t.transaction_date DESC, t.id DESC
         LIMIT ?
-    """, (ticker, limit))
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    """
+    if stream:
+        return _stream_rows(sql, (*params, limit), conn)
+    return _fetch_dicts(sql, (*params, limit), conn)
 
 
-def get_trades_by_member(name: str, limit: int = 100) -> list[dict]:
-    """Get all trades for a specific member (partial match)."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def get_trades_by_ticker(
+    ticker: str,
+    limit: int = 100,
+    after: Optional[tuple] = None,
+    stream: bool = False
+) -> Union[list[dict], Iterator[tuple]]:
+    """
+    Get all trades for a specific ticker.
 
-    cursor.execute("""
-        SELECT
-            t.*,
-            m.name as member_name,
-            m.chamber,
-            m.party,
-            m.state
+    Pass after=(transaction_date, id) of the last row of a page to get the
+    next page. stream=True yields plain tuples as in get_recent_trades.
+    """
+    keyset = ""
+    params = [ticker]
+    if after:
+        keyset = "AND (t.transaction_date, t.id) < (?, ?)"
+        params.extend(after)
+
+    sql = f"""
+        SELECT {_TRADE_LISTING_SELECT if stream else _TRADE_SELECT}
         FROM trades t
         JOIN members m ON t.member_id = m.id
-        WHERE m.name LIKE ?
-        ORDER BY t.transaction_date DESC
+        WHERE t.ticker = ? COLLATE NOCASE
+          {keyset}
+        ORDER BY t.transaction_date DESC, t.id DESC
         LIMIT ?
-    """, (f"%{name}%", limit))
+    """
+    if stream:
+        return _stream_rows(sql, (*params, limit))
+    return _fetch_dicts(sql, (*params, limit))
 
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+
+def get_trades_by_member(
+    name: str,
+    limit: int = 100,
+    after: Optional[tuple] = None,
+    stream: bool = False,
+    conn: Optional[sqlite3.Connection] = None
+) -> Union[list[dict], Iterator[tuple]]:
+    """
+    Get all trades for a specific member (partial match).
+
+    Pass after=(transaction_date, id) of the last row of a page to get the
+    next page. stream=True yields plain tuples as in get_recent_trades.
+    """
+    keyset = ""
+    params = [f"%{name}%"]
+    if after:
+        keyset = "AND (t.transaction_date, t.id) < (?, ?)"
+        params.extend(after)
+
+    sql = f"""
+        SELECT {_TRADE_LISTING_SELECT if stream else _TRADE_SELECT}
+        FROM members_fts f
+        JOIN members m ON m.id = f.rowid
+        JOIN trades t ON t.member_id = m.id
+        WHERE f.name LIKE ?
+          {keyset}
+        ORDER BY t.transaction_date DESC, t.id DESC
+        LIMIT ?
+    """
+    if stream:
+        return _stream_rows(sql, (*params, limit), conn)
+    return _fetch_dicts(sql, (*params, limit), conn)
 
 
 def get_trade_count() -> dict:
@@ -287,31 +546,25 @@ def get_trade_count() -> dict:
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT COUNT(*) as total FROM trades")
-    total = cursor.fetchone()["total"]
-
-    cursor.execute("SELECT COUNT(*) as total FROM members")
-    members = cursor.fetchone()["total"]
-
-    cursor.execute("""
-        SELECT COUNT(*) as total FROM trades
-        WHERE disclosure_date >= date('now', '-7 days')
-    """)
-    last_week = cursor.fetchone()["total"]
-
+    # All four counts in one statement; the last day is a subset of the last
+    # week, so both come from a single idx_trades_disclosure_trans range scan
     cursor.execute("""
-        SELECT COUNT(*) as total FROM trades
-        WHERE disclosure_date >= date('now', '-1 days')
-    """)
-    today = cursor.fetchone()["total"]
-
-    conn.close()
-    return {
-        "total_trades": total,
-        "total_members": members,
-        "trades_last_week": last_week,
-        "trades_today": today
-    }
+        SELECT
+            (SELECT COUNT(*) FROM trades) as total_trades,
+            (SELECT COUNT(*) FROM members) as total_members,
+            recent.trades_last_week,
+            recent.trades_today
+        FROM (
+            SELECT
+                COUNT(*) as trades_last_week,
+                COALESCE(SUM(disclosure_date >= ?), 0) as trades_today
+            FROM trades
+            WHERE disclosure_date >= ?
+        ) recent
+    """, (_days_ago(1), _days_ago(7)))
+    counts = dict(cursor.fetchone())
+
+    return counts
 
 
 def start_sync(sync_type: str) -> int:
@@ -322,9 +575,7 @@ def start_sync(sync_type: str) -> int:
         "INSERT INTO sync_log (sync_type) VALUES (?)",
         (sync_type,)
     )
-    conn.commit()
     sync_id = cursor.lastrowid
-    conn.close()
     return sync_id
 
 
@@ -337,8 +588,8 @@ def complete_sync(sync_id: int, trades_added: int, status: str = "completed") ->
         SET completed_at = CURRENT_TIMESTAMP, trades_added = ?, status = ?
         WHERE id = ?
     """, (trades_added, status, sync_id))
-    conn.commit()
-    conn.close()
+    # A sync can add many trades; let SQLite re-ANALYZE tables that grew
+    cursor.execute("PRAGMA optimize")
 
 
 def get_last_sync() -> Optional[dict]:
@@ -352,10 +603,40 @@ def get_last_sync() -> Optional[dict]:
         LIMIT 1
     """)
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
+def get_http_cache(url: str) -> Optional[dict]:
+    """Get the saved scope and ETag/Last-Modified for a URL."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT scope, etag, last_modified FROM http_cache WHERE url = ?", (url,)
+    )
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def save_http_cache(
+    url: str,
+    scope: Optional[str],
+    etag: Optional[str],
+    last_modified: Optional[str]
+):
+    """Save the ETag/Last-Modified of a URL's latest response and the scope it applies to."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO http_cache (url, scope, etag, last_modified)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET
+            scope = excluded.scope,
+            etag = excluded.etag,
+            last_modified = excluded.last_modified,
+            updated_at = CURRENT_TIMESTAMP
+    """, (url, scope, etag, last_modified))
+
+
 # =============================================================================
 # Price Cache Functions
 # =============================================================================
@@ -370,27 +651,26 @@ def get_cached_prices(ticker: str, start_date: str, end_date: str) -> dict:
         ORDER BY price_date
     """, (ticker, start_date, end_date))
     rows = cursor.fetchall()
-    conn.close()
     return {row["price_date"]: row["close_price"] for row in rows}
 
 
+_CACHE_PRICE_SQL = """
+    INSERT OR REPLACE INTO price_cache (ticker, price_date, close_price)
+    VALUES (?, ?, ?)
+"""
+
+
 def cache_prices(ticker: str, prices: dict) -> int:
     """Store prices in cache. prices = {date_str: price}. Returns count added."""
+    if not prices:
+        return 0
     conn = get_connection()
-    cursor = conn.cursor()
-    added = 0
-    for date_str, price in prices.items():
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO price_cache (ticker, price_date, close_price)
-                VALUES (?, ?, ?)
-            """, (ticker, date_str, price))
-            added += 1
-        except sqlite3.Error:
-            pass
-    conn.commit()
-    conn.close()
-    return added
+    with _transaction(conn):
+        cursor = conn.executemany(
+            _CACHE_PRICE_SQL,
+            ((ticker, date_str, price) for date_str, price in prices.items())
+        )
+    return cursor.rowcount
 
 
 def get_all_cached_tickers() -> list[str]:
@@ -399,7 +679,6 @@ def get_all_cached_tickers() -> list[str]:
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT ticker FROM price_cache")
     rows = cursor.fetchall()
-    conn.close()
     return [row["ticker"] for row in rows]
 
 
@@ -413,10 +692,23 @@ def get_trade_return(trade_id: int) -> Optional[dict]:
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM trade_returns WHERE trade_id = ?", (trade_id,))
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
+_UPSERT_TRADE_RETURN_SQL = """
+    INSERT INTO trade_returns
+        (trade_id, entry_date, entry_price, return_30d, return_30d_date,
+         return_current, return_current_date, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(trade_id) DO UPDATE SET
+        return_30d = COALESCE(excluded.return_30d, trade_returns.return_30d),
+        return_30d_date = COALESCE(excluded.return_30d_date, trade_returns.return_30d_date),
+        return_current = excluded.return_current,
+        return_current_date = excluded.return_current_date,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
 def upsert_trade_return(
     trade_id: int,
     entry_date: str,
@@ -429,29 +721,34 @@ def upsert_trade_return(
     """Insert or update trade return. Returns the row id."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO trade_returns
-            (trade_id, entry_date, entry_price, return_30d, return_30d_date,
-             return_current, return_current_date, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ON CONFLICT(trade_id) DO UPDATE SET
-            return_30d = COALESCE(excluded.return_30d, trade_returns.return_30d),
-            return_30d_date = COALESCE(excluded.return_30d_date, trade_returns.return_30d_date),
-            return_current = excluded.return_current,
-            return_current_date = excluded.return_current_date,
-            updated_at = CURRENT_TIMESTAMP
-    """, (trade_id, entry_date, entry_price, return_30d, return_30d_date,
-          return_current, return_current_date))
-    conn.commit()
+    cursor.execute(_UPSERT_TRADE_RETURN_SQL, (
+        trade_id, entry_date, entry_price, return_30d, return_30d_date,
+        return_current, return_current_date
+    ))
     row_id = cursor.lastrowid
-    conn.close()
     return row_id
 
 
-def get_all_trade_returns() -> list[dict]:
-    """Get all trade returns with member info."""
+def upsert_trade_returns_bulk(rows: list[tuple]) -> int:
+    """
+    Insert or update many trade returns in a single transaction.
+
+    Each row is (trade_id, entry_date, entry_price, return_30d, return_30d_date,
+    return_current, return_current_date). Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    conn = get_connection()
+    with _transaction(conn):
+        conn.executemany(_UPSERT_TRADE_RETURN_SQL, rows)
+    return len(rows)
+
+
+def iter_all_trade_returns() -> Iterator[sqlite3.Row]:
+    """Yield all trade returns with member info, FETCH_BATCH_SIZE rows at a time."""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.arraysize = FETCH_BATCH_SIZE
     cursor.execute("""
         SELECT
             tr.*,
@@ -467,16 +764,16 @@ def get_all_trade_returns() -> list[dict]:
         JOIN trades t ON tr.trade_id = t.id
         JOIN members m ON t.member_id = m.id
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield from rows
 
 
 def get_trades_needing_returns() -> list[dict]:
     """Get trades that don't have returns calculated yet."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
+    return _fetch_dicts("""
         SELECT
             t.id,
             t.ticker,
@@ -491,16 +788,34 @@ def get_trades_needing_returns() -> list[dict]:
           AND t.ticker != ''
           AND t.transaction_type IN ('purchase', 'sale')
           AND tr.id IS NULL
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    """, ())
 
 
 # =============================================================================
 # Sharpe Snapshot Functions
 # =============================================================================
 
+_SAVE_SHARPE_SNAPSHOT_SQL = """
+    INSERT INTO sharpe_snapshots
+        (member_id, snapshot_date, sharpe_30d, sharpe_current, num_trades,
+         mean_return_30d, std_return_30d, mean_return_current, std_return_current,
+         win_rate_30d, win_rate_current, total_return_30d, total_return_current)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(member_id, snapshot_date) DO UPDATE SET
+        sharpe_30d = excluded.sharpe_30d,
+        sharpe_current = excluded.sharpe_current,
+        num_trades = excluded.num_trades,
+        mean_return_30d = excluded.mean_return_30d,
+        std_return_30d = excluded.std_return_30d,
+        mean_return_current = excluded.mean_return_current,
+        std_return_current = excluded.std_return_current,
+        win_rate_30d = excluded.win_rate_30d,
+        win_rate_current = excluded.win_rate_current,
+        total_return_30d = excluded.total_return_30d,
+        total_return_current = excluded.total_return_current
+"""
+
+
 def save_sharpe_snapshot(
     member_id: int,
     snapshot_date: str,
@@ -519,68 +834,126 @@ def save_sharpe_snapshot(
     """Save a Sharpe ratio snapshot. Returns row id."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO sharpe_snapshots
-            (member_id, snapshot_date, sharpe_30d, sharpe_current, num_trades,
-             mean_return_30d, std_return_30d, mean_return_current, std_return_current,
-             win_rate_30d, win_rate_current, total_return_30d, total_return_current)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(member_id, snapshot_date) DO UPDATE SET
-            sharpe_30d = excluded.sharpe_30d,
-            sharpe_current = excluded.sharpe_current,
-            num_trades = excluded.num_trades,
-            mean_return_30d = excluded.mean_return_30d,
-            std_return_30d = excluded.std_return_30d,
-            mean_return_current = excluded.mean_return_current,
-            std_return_current = excluded.std_return_current,
-            win_rate_30d = excluded.win_rate_30d,
-            win_rate_current = excluded.win_rate_current,
-            total_return_30d = excluded.total_return_30d,
-            total_return_current = excluded.total_return_current
-    """, (member_id, snapshot_date, sharpe_30d, sharpe_current, num_trades,
-          mean_return_30d, std_return_30d, mean_return_current, std_return_current,
-          win_rate_30d, win_rate_current, total_return_30d, total_return_current))
-    conn.commit()
+    cursor.execute(_SAVE_SHARPE_SNAPSHOT_SQL, (
+        member_id, snapshot_date, sharpe_30d, sharpe_current, num_trades,
+        mean_return_30d, std_return_30d, mean_return_current, std_return_current,
+        win_rate_30d, win_rate_current, total_return_30d, total_return_current
+    ))
     row_id = cursor.lastrowid
-    conn.close()
     return row_id
 
 
+def save_sharpe_snapshots_bulk(rows: list[tuple]) -> int:
+    """
+    Save many Sharpe ratio snapshots in a single transaction.
+
+    Each row follows the save_sharpe_snapshot argument order, starting with
+    (member_id, snapshot_date, ...). member_sharpe_latest is rebuilt in the
+    same transaction, so the whole batch costs one commit. Returns the number
+    of rows written.
+    """
+    if not rows:
+        return 0
+    conn = get_connection()
+    with _transaction(conn):
+        conn.executemany(_SAVE_SHARPE_SNAPSHOT_SQL, rows)
+        _refresh_member_sharpe_latest(conn)
+    return len(rows)
+
+
 def get_sharpe_history(member_id: int, limit: int = 100) -> list[dict]:
     """Get Sharpe ratio history for a member."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
+    return _fetch_dicts("""
         SELECT * FROM sharpe_snapshots
         WHERE member_id = ?
         ORDER BY snapshot_date DESC
         LIMIT ?
     """, (member_id, limit))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
 
 
-def get_latest_sharpe_all_members() -> list[dict]:
-    """Get the latest Sharpe snapshot for all members."""
+_REFRESH_MEMBER_SHARPE_LATEST_SQL = """
+    WITH latest(snapshot_date) AS (
+        SELECT MAX(snapshot_date) FROM sharpe_snapshots
+    )
+    INSERT INTO member_sharpe_latest (
+        member_id, snapshot_id, snapshot_date, sharpe_30d, sharpe_current,
+        num_trades, mean_return_30d, std_return_30d, mean_return_current,
+        std_return_current, win_rate_30d, win_rate_current,
+        total_return_30d, total_return_current, member_name, chamber, party
+    )
+    SELECT
+        ss.member_id, ss.id, ss.snapshot_date, ss.sharpe_30d, ss.sharpe_current,
+        ss.num_trades, ss.mean_return_30d, ss.std_return_30d, ss.mean_return_current,
+        ss.std_return_current, ss.win_rate_30d, ss.win_rate_current,
+        ss.total_return_30d, ss.total_return_current, m.name, m.chamber, m.party
+    FROM latest
+    JOIN sharpe_snapshots ss ON ss.snapshot_date = latest.snapshot_date
+    JOIN members m ON ss.member_id = m.id
+"""
+
+
+def _refresh_member_sharpe_latest(conn: sqlite3.Connection) -> int:
+    """Rebuild member_sharpe_latest inside the caller's transaction."""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM member_sharpe_latest")
+    cursor.execute(_REFRESH_MEMBER_SHARPE_LATEST_SQL)
+    return cursor.rowcount
+
+
+def refresh_member_sharpe_latest() -> int:
+    """
+    Rebuild member_sharpe_latest from the latest Sharpe snapshot.
+
+    Returns the number of members written.
+    """
     conn = get_connection()
+    with _transaction(conn):
+        count = _refresh_member_sharpe_latest(conn)
+    return count
+
+
+def get_latest_snapshot_date(conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    """Get the date of the most recent Sharpe snapshot."""
+    conn = conn or get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT
-            ss.*,
-            m.name as member_name,
-            m.chamber,
-            m.party
-        FROM sharpe_snapshots ss
-        JOIN members m ON ss.member_id = m.id
-        WHERE ss.snapshot_date = (
-            SELECT MAX(snapshot_date) FROM sharpe_snapshots
-        )
-        ORDER BY ss.sharpe_30d DESC
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    cursor.execute("SELECT MAX(snapshot_date) as snapshot_date FROM member_sharpe_latest")
+    row = cursor.fetchone()
+    return row["snapshot_date"]
+
+
+def get_latest_sharpe_all_members(
+    limit: Optional[int] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> list[dict]:
+    """Get the latest Sharpe snapshot for all members (or the top `limit`), best first."""
+    return _fetch_dicts("""
+        SELECT * FROM member_sharpe_latest
+        ORDER BY sharpe_30d DESC NULLS LAST
+        LIMIT ?
+    """, (limit if limit is not None else -1,), conn)
+
+
+def get_latest_sharpe(
+    chamber: Optional[str] = None,
+    limit: Optional[int] = None,
+    max_abs_sharpe: Optional[float] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> list[dict]:
+    """
+    Get the latest Sharpe snapshots with a valid 30-day Sharpe, best first.
+
+    Optionally restrict to one chamber, drop ratios with |sharpe_30d| >=
+    max_abs_sharpe, and return only the top `limit` rows.
+    """
+    return _fetch_dicts("""
+        SELECT * FROM member_sharpe_latest
+        WHERE (? IS NULL OR chamber = ?)
+          AND sharpe_30d IS NOT NULL
+          AND (? IS NULL OR ABS(sharpe_30d) < ?)
+        ORDER BY sharpe_30d DESC
+        LIMIT ?
+    """, (chamber, chamber, max_abs_sharpe, max_abs_sharpe,
+          limit if limit is not None else -1), conn)
 
 
 def get_member_id_by_name(name: str) -> Optional[int]:
@@ -589,5 +962,4 @@ def get_member_id_by_name(name: str) -> Optional[int]:
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM members WHERE name = ?", (name,))
     row = cursor.fetchone()
-    conn.close()
     return row["id"] if row else None
@@ -10,19 +10,42 @@ Setup:
 3. Update NTFY_TOPIC in config.py
 """
 
-import requests
+import atexit
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
+from typing import Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from . import config
 
+# One keep-alive session for every notification, so bursts of sends reuse
+# pooled TLS connections to the NTFY server (one per concurrent sender).
+# Retry covers connection failures; urllib3 doesn't re-send a POST once the
+# server has read it.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=2, pool_maxsize=config.NOTIFY_WORKERS,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)  # self-hosted NTFY servers
+atexit.register(_SESSION.close)
+
+_NOTIFY_START, _NOTIFY_END = config.NOTIFY_HOURS
+_NTFY_URL = f"{config.NTFY_SERVER}/{config.NTFY_TOPIC}"
+_PRIORITIES = {p: str(p) for p in range(1, 6)}  # NTFY Priority header values
+
 
 def is_quiet_hours() -> bool:
     """Check if we're in quiet hours (shouldn't send notifications)."""
-    current_hour = datetime.now().hour
-    start_hour, end_hour = config.NOTIFY_HOURS
-    return not (start_hour <= current_hour < end_hour)
+    return not (_NOTIFY_START <= datetime.now().hour < _NOTIFY_END)
 
 
+@lru_cache(maxsize=32)
 def format_amount(amount_range: str) -> str:
     """Format amount range for display."""
     if not amount_range:
@@ -33,7 +56,7 @@ def format_amount(amount_range: str) -> str:
 
 def send_notification(
     title: str,
-    message: str,
+    message: Union[str, bytes],
     priority: int = 3,
     tags: list[str] = None,
     click_url: str = None
@@ -43,7 +66,7 @@ def send_notification(
 
     Args:
         title: Notification title
-        message: Notification body
+        message: Notification body (str, or already UTF-8 encoded bytes)
         priority: 1 (min) to 5 (max), default 3
         tags: Emoji tags (e.g., ["chart_with_upwards_trend", "moneybag"])
         click_url: URL to open when notification is tapped
@@ -59,11 +82,9 @@ def send_notification(
         print(f"  Skipping notification (quiet hours: {config.NOTIFY_HOURS[0]}:00 - {config.NOTIFY_HOURS[1]}:00)")
         return False
 
-    url = f"{config.NTFY_SERVER}/{config.NTFY_TOPIC}"
-
     headers = {
         "Title": title,
-        "Priority": str(priority),
+        "Priority": _PRIORITIES.get(priority) or str(priority),
     }
 
     if tags:
@@ -73,7 +94,8 @@ def send_notification(
         headers["Click"] = click_url
 
     try:
-        response = requests.post(url, data=message.encode("utf-8"), headers=headers, timeout=10)
+        body = message.encode("utf-8") if isinstance(message, str) else message
+        response = _SESSION.post(_NTFY_URL, data=body, headers=headers, timeout=10)
         response.raise_for_status()
         return True
     except requests.RequestException as e:
@@ -134,20 +156,21 @@ def notify_daily_digest(trades: list[dict]) -> bool:
     if not trades:
         return False
 
-    # Count by type
-    purchases = sum(1 for t in trades if "purchase" in t.get("transaction_type", "").lower())
-    sales = sum(1 for t in trades if "sale" in t.get("transaction_type", "").lower())
-
-    # Get unique members
-    members = set(t.get("member_name", "Unknown") for t in trades)
-
-    # Get top tickers
-    tickers = {}
+    # Count by type, unique members and tickers in one pass
+    purchases = sales = 0
+    members = set()
+    tickers = Counter()
     for t in trades:
+        tx_type = t.get("transaction_type", "").lower()
+        if "purchase" in tx_type:
+            purchases += 1
+        if "sale" in tx_type:
+            sales += 1
+        members.add(t.get("member_name", "Unknown"))
         ticker = t.get("ticker")
         if ticker and ticker != "N/A":
-            tickers[ticker] = tickers.get(ticker, 0) + 1
-    top_tickers = sorted(tickers.items(), key=lambda x: x[1], reverse=True)[:5]
+            tickers[ticker] += 1
+    top_tickers = tickers.most_common(5)
 
     title = f"Congress Trades: {len(trades)} new today"
 
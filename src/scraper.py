@@ -7,18 +7,70 @@ Extracts congressional trading data from capitoltrades.com.
 import requests
 import json
 import re
-from datetime import datetime, timedelta
-from typing import Optional
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, Optional
 from dateutil import parser as date_parser
+from requests.adapters import HTTPAdapter
 
 from . import config
 from . import db
 
+# Shared keep-alive session for page fetches: concurrent workers each hold a
+# pooled connection, so later pages skip the TCP/TLS handshake
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+# Accept-Encoding is left to requests: gzip and deflate, plus br when brotli
+# is installed, all decoded transparently
+_session_pool_size = 0
+
+
+def _size_session_pool(workers: int) -> None:
+    """Pool one connection per page worker, remounting the adapter if the count changed."""
+    global _session_pool_size
+    if workers != _session_pool_size:
+        previous = _SESSION.adapters.get("https://")
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        if previous is not None:
+            previous.close()
+        _session_pool_size = workers
+
+
+_size_session_pool(config.FETCH_WORKERS)
+
+# Processed trades written per transaction during a sync
+INSERT_BATCH_SIZE = 500
+
 
 def parse_date(date_str: Optional[str]) -> Optional[str]:
     """Parse various date formats into YYYY-MM-DD."""
+    # Non-strings (possibly unhashable) never parse, so keep them out of the cache
+    if not isinstance(date_str, str):
+        return None
+    return _parse_date_str(date_str)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_str: str) -> Optional[str]:
     if not date_str or date_str == "--":
         return None
+    # Fixed shapes parsed directly; dateutil only sees anything else (or
+    # strings of these shapes that aren't valid dates)
+    try:
+        if len(date_str) >= 10 and date_str[4] == "-" and date_str[7] == "-":
+            # YYYY-MM-DD, optionally followed by a THH:MM:SS time
+            if len(date_str) == 10 or date_str[10] == "T":
+                return date.fromisoformat(date_str[:10]).isoformat()
+        elif (len(date_str) == 10 and date_str[2] == "/" and date_str[5] == "/"
+              and date_str.replace("/", "").isdigit()):
+            # MM/DD/YYYY
+            return date(int(date_str[6:]), int(date_str[:2]), int(date_str[3:5])).isoformat()
+    except ValueError:
+        pass
     try:
         parsed = date_parser.parse(date_str)
         return parsed.strftime("%Y-%m-%d")
@@ -26,44 +78,56 @@ def parse_date(date_str: Optional[str]) -> Optional[str]:
         return None
 
 
+# Exact transaction types and their standard form; anything else is matched
+# by the keywords below, in priority order
+_TX_TYPES = {
+    "buy": "purchase",
+    "sell": "sale",
+    "purchase": "purchase",
+    "sale": "sale",
+    "exchange": "exchange",
+}
+_TX_KEYWORDS = ("purchase", "sale", "exchange")
+
+
 def normalize_transaction_type(tx_type: str) -> str:
     """Normalize transaction type to lowercase standard form."""
     tx_type = tx_type.lower().strip()
-    if tx_type == "buy":
-        return "purchase"
-    elif tx_type == "sell":
-        return "sale"
-    elif "purchase" in tx_type:
-        return "purchase"
-    elif "sale" in tx_type:
-        return "sale"
-    elif "exchange" in tx_type:
-        return "exchange"
+    normalized = _TX_TYPES.get(tx_type)
+    if normalized:
+        return normalized
+    for keyword in _TX_KEYWORDS:
+        if keyword in tx_type:
+            return keyword
     return tx_type
 
 
+# Upper bound (inclusive) of each disclosure amount range, and its label;
+# the last label covers everything above the last bound
+_AMOUNT_BOUNDS = (1000, 15000, 50000, 100000, 250000, 500000, 1000000, 5000000)
+_AMOUNT_RANGES = (
+    "$1 - $1,000",
+    "$1,001 - $15,000",
+    "$15,001 - $50,000",
+    "$50,001 - $100,000",
+    "$100,001 - $250,000",
+    "$250,001 - $500,000",
+    "$500,001 - $1,000,000",
+    "$1,000,001 - $5,000,000",
+    "$5,000,001+",
+)
+
+
 def value_to_amount_range(value: Optional[int]) -> str:
     """Convert numeric value to amount range string."""
     if value is None:
         return "Unknown"
-    if value <= 1000:
-        return "$1 - $1,000"
-    elif value <= 15000:
-        return "$1,001 - $15,000"
-    elif value <= 50000:
-        return "$15,001 - $50,000"
-    elif value <= 100000:
-        return "$50,001 - $100,000"
-    elif value <= 250000:
-        return "$100,001 - $250,000"
-    elif value <= 500000:
-        return "$250,001 - $500,000"
-    elif value <= 1000000:
-        return "$500,001 - $1,000,000"
-    elif value <= 5000000:
-        return "$1,000,001 - $5,000,000"
-    else:
-        return "$5,000,001+"
+    return _AMOUNT_RANGES[bisect_left(_AMOUNT_BOUNDS, value)]
+
+
+# Watchlists normalized once instead of per trade
+_WATCH_TICKERS = frozenset(t.upper() for t in config.WATCH_TICKERS)
+_WATCH_MEMBERS = tuple(m.lower() for m in config.WATCH_MEMBERS)
 
 
 def should_include_trade(trade: dict) -> bool:
@@ -84,49 +148,141 @@ def should_include_trade(trade: dict) -> bool:
     if "joint" in owner and not config.INCLUDE_JOINT:
         return False
 
-    if config.WATCH_TICKERS:
+    if _WATCH_TICKERS:
         ticker = trade.get("ticker", "")
         if ticker:
             ticker_base = ticker.split(":")[0] if ":" in ticker else ticker
-            if ticker_base.upper() not in [t.upper() for t in config.WATCH_TICKERS]:
+            if ticker_base.upper() not in _WATCH_TICKERS:
                 return False
         else:
             return False
 
-    if config.WATCH_MEMBERS:
-        member_name = trade.get("member_name", "")
-        if not any(m.lower() in member_name.lower() for m in config.WATCH_MEMBERS):
+    if _WATCH_MEMBERS:
+        member_name = trade.get("member_name", "").lower()
+        if not any(m in member_name for m in _WATCH_MEMBERS):
             return False
 
     return True
 
 
-def fetch_capitol_trades_page(page: int = 1) -> list[dict]:
-    """Fetch a single page of trades from Capitol Trades."""
-    url = f"{config.CAPITOL_TRADES_URL}?page={page}"
+# Start of the trades array in a Capitol Trades page, matched escaped or not
+_DATA_ARRAY_RE = re.compile(r'\\?"data\\?":(\[)')
+_JSON_DECODER = json.JSONDecoder()
 
+
+def _in_watchlists(raw_trade: dict) -> bool:
+    """
+    Check a raw Capitol Trades record against WATCH_TICKERS / WATCH_MEMBERS.
+
+    Gives the same answer as the watchlist part of should_include_trade, so
+    records that can't pass are dropped before process_capitol_trade.
+    """
+    if _WATCH_TICKERS:
+        ticker = raw_trade.get("issuer", {}).get("issuerTicker") or ""
+        ticker = ticker.split(":")[0]
+        if not ticker or ticker.upper() not in _WATCH_TICKERS:
+            return False
+
+    if _WATCH_MEMBERS:
+        politician = raw_trade.get("politician", {})
+        member_name = f"{politician.get('firstName', '')} {politician.get('lastName', '')}".strip().lower()
+        if not any(m in member_name for m in _WATCH_MEMBERS):
+            return False
+
+    return True
+
+
+def _page_url(page: int) -> str:
+    return f"{config.CAPITOL_TRADES_URL}?page={page}"
+
+
+def _parse_trades_page(text: str) -> list[dict]:
+    """Extract the trades array from a Capitol Trades page."""
+    # Find the data array (escaped when embedded in the page script), then
+    # unescape and decode only from there instead of copying the whole page
+    data_match = _DATA_ARRAY_RE.search(text)
+    if not data_match:
+        return []
+
+    payload = text[data_match.start(1):].replace('\\"', '"')
+    data, _ = _JSON_DECODER.raw_decode(payload)
+    return data
+
+
+def _fetch_page(page: int) -> Optional[list[dict]]:
+    """Fetch a single page of trades, or None if the request failed."""
     try:
-        response = requests.get(url, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        response = _SESSION.get(_page_url(page), timeout=30)
         response.raise_for_status()
+        return _parse_trades_page(response.text)
+    except Exception as e:
+        print(f"  Error fetching page {page}: {e}")
+        return None
+
+
+def fetch_capitol_trades_page(page: int = 1) -> list[dict]:
+    """Fetch a single page of trades from Capitol Trades."""
+    return _fetch_page(page) or []
+
 
-        # Unescape the embedded JSON
-        text = response.text.replace('\\"', '"')
+def _sync_scope(lookback_days: Optional[int], max_pages: int) -> str:
+    """Describe the settings that decide which trades a sync stores."""
+    filters = (
+        config.INCLUDE_PURCHASES, config.INCLUDE_SALES, config.INCLUDE_SELF,
+        config.INCLUDE_SPOUSE, config.INCLUDE_DEPENDENT, config.INCLUDE_JOINT,
+        sorted(_WATCH_TICKERS), _WATCH_MEMBERS,
+    )
+    return json.dumps([lookback_days, max_pages, filters])
 
-        # Find the data array
-        data_match = re.search(r'"data":(\[)', text)
-        if not data_match:
-            return []
 
-        start = data_match.start(1)
-        decoder = json.JSONDecoder()
-        data, _ = decoder.raw_decode(text[start:])
+def fetch_first_page_if_modified(scope: Optional[str] = None) -> tuple[Optional[list[dict]], Optional[dict]]:
+    """
+    Fetch page 1, conditionally if the last sync saved validators for scope.
 
-        return data
+    Validators saved by a sync with other settings (or no scope at all)
+    are ignored, and the page is fetched in full.
+
+    Returns (trades, validators). trades is None when the server answered
+    304 Not Modified; validators are the response's ETag/Last-Modified, to
+    be saved once the page's trades are stored. On errors returns ([], None)
+    like fetch_capitol_trades_page.
+    """
+    url = _page_url(1)
+    headers = {}
+    cached = db.get_http_cache(url) if scope else None
+    if cached and cached["scope"] == scope:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        response = _SESSION.get(url, timeout=30, headers=headers)
+        if response.status_code == 304:
+            return None, None
+        response.raise_for_status()
+        trades = _parse_trades_page(response.text)
     except Exception as e:
-        print(f"  Error fetching page {page}: {e}")
-        return []
+        print(f"  Error fetching page 1: {e}")
+        return [], None
+
+    validators = None
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    return trades, validators
+
+
+# Capitol Trades owner values and their display form
+_OWNERS = {
+    "self": "Self",
+    "spouse": "Spouse",
+    "joint": "Joint",
+    "child": "Dependent Child",
+    "dependent": "Dependent Child"
+}
 
 
 def process_capitol_trade(raw_trade: dict) -> Optional[dict]:
@@ -160,14 +316,7 @@ def process_capitol_trade(raw_trade: dict) -> Optional[dict]:
 
     # Map owner field
     owner = raw_trade.get("owner", "")
-    owner_map = {
-        "self": "Self",
-        "spouse": "Spouse",
-        "joint": "Joint",
-        "child": "Dependent Child",
-        "dependent": "Dependent Child"
-    }
-    owner = owner_map.get(owner.lower(), owner.title() if owner else None)
+    owner = _OWNERS.get(owner.lower(), owner.title() if owner else None)
 
     return {
         "member_name": member_name,
@@ -189,33 +338,119 @@ def process_capitol_trade(raw_trade: dict) -> Optional[dict]:
     }
 
 
-def fetch_all_trades(max_pages: int = 100) -> list[dict]:
-    """Fetch all trades from Capitol Trades with pagination."""
-    all_trades = []
+def iter_all_trades(
+    max_pages: int = 100,
+    max_workers: Optional[int] = None,
+    first_page: Optional[list[dict]] = None,
+    failed_pages: Optional[list[int]] = None
+) -> Iterator[dict]:
+    """
+    Yield all trades from Capitol Trades with pagination, page by page.
+
+    max_workers pages are kept in flight and handled in page order: as each
+    page is handed to the caller the next one is requested, so downloads
+    continue while the caller processes and stores trades. At most
+    max_workers pages past the last one are fetched needlessly.
+
+    first_page, if given, is used as page 1 instead of fetching it. A page
+    that can't be fetched ends the iteration like an empty one; its number
+    is appended to failed_pages, if given.
+    """
+    total = 0
+    max_workers = max_workers or config.FETCH_WORKERS
+    _size_session_pool(max_workers)
+    pages = iter(range(1, max_pages + 1))
 
     print("Fetching trades from Capitol Trades...")
-    for page in range(1, max_pages + 1):
-        trades = fetch_capitol_trades_page(page)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        if first_page is not None:
+            done = Future()
+            done.set_result(first_page)
+            in_flight.append((next(pages), done))
+        in_flight.extend(
+            (page, executor.submit(_fetch_page, page))
+            for page in islice(pages, max_workers)
+        )
+        while in_flight:
+            page, future = in_flight.popleft()
+            trades = future.result()
+            if trades is None:
+                if failed_pages is not None:
+                    failed_pages.append(page)
+                break
+            if not trades:
+                print(f"  No more trades at page {page}")
+                break
+
+            # Refill the window before handing this page over
+            next_page = next(pages, None)
+            if next_page is not None:
+                in_flight.append((next_page, executor.submit(_fetch_page, next_page)))
+
+            total += len(trades)
+            print(f"  Page {page}: {len(trades)} trades (total: {total})")
+            yield from trades
+
+            # Stop if we got fewer than expected (last page)
+            if len(trades) < config.TRADES_PER_PAGE:
+                break
+
+        # Pages past the end that haven't started yet
+        for _, future in in_flight:
+            future.cancel()
+
+    print(f"  Retrieved {total} trades total")
+
+
+def fetch_all_trades(max_pages: int = 100, max_workers: Optional[int] = None) -> list[dict]:
+    """Fetch all trades from Capitol Trades with pagination."""
+    return list(iter_all_trades(max_pages=max_pages, max_workers=max_workers))
 
-        if not trades:
-            print(f"  No more trades at page {page}")
-            break
 
-        all_trades.extend(trades)
-        print(f"  Page {page}: {len(trades)} trades (total: {len(all_trades)})")
+def _member_key(trade: dict) -> tuple:
+    """get_or_create_member arguments for a processed trade."""
+    return (trade["member_name"], trade["chamber"], trade["party"], trade["state"], trade["district"])
 
-        # Stop if we got fewer than expected (last page)
-        if len(trades) < config.TRADES_PER_PAGE:
-            break
 
-    print(f"  Retrieved {len(all_trades)} trades total")
-    return all_trades
+def _store_trades(trades: list[dict], member_ids: dict) -> list[Optional[int]]:
+    """
+    Write processed trades, upserting their members first.
+
+    member_ids caches member ID by _member_key() across calls, so each
+    distinct member is upserted once per sync. One transaction for the new
+    members and one for the trades. Returns the new trade ID for each trade,
+    or None where it was a duplicate.
+    """
+    new_members = list(dict.fromkeys(
+        key for key in map(_member_key, trades) if key not in member_ids
+    ))
+    member_ids.update(zip(new_members, db.get_or_create_members_bulk(new_members)))
+    return db.insert_trades_bulk([
+        (
+            member_ids[_member_key(t)],
+            t["transaction_date"],
+            t["disclosure_date"],
+            t["ticker"],
+            t["asset_description"],
+            t["asset_type"],
+            t["transaction_type"],
+            t["amount_range"],
+            t["owner"],
+            t["comment"],
+            t["source_url"],
+            t["cap_gains_over_200"]
+        )
+        for t in trades
+    ])
 
 
 def sync_trades(
     lookback_days: Optional[int] = None,
     notify_callback: Optional[callable] = None,
-    max_pages: int = 100
+    max_pages: int = 100,
+    max_workers: Optional[int] = None,
+    conditional: bool = False
 ) -> dict:
     """
     Sync trades from Capitol Trades.
@@ -224,6 +459,9 @@ def sync_trades(
         lookback_days: Only process trades from the last N days.
         notify_callback: Function to call for each new trade.
         max_pages: Maximum number of pages to fetch.
+        max_workers: Pages fetched concurrently (default config.FETCH_WORKERS).
+        conditional: Skip the sync when page 1 is unchanged since the last
+            sync with the same lookback, max_pages and filters.
 
     Returns:
         dict with sync statistics
@@ -237,14 +475,33 @@ def sync_trades(
         print(f"Processing trades since {cutoff_date}")
 
     new_trades = []
+    pending = []  # processed trades waiting for the next batch write
+    stored = []  # (trade, trade ID or None if duplicate)
+    member_ids = {}  # _member_key() -> member ID, filled as members are seen
     skipped_old = 0
     skipped_filter = 0
     duplicates = 0
 
-    # Fetch all trades
-    raw_trades = fetch_all_trades(max_pages=max_pages)
+    # Nothing has been published since the last sync if page 1 is unchanged
+    scope = _sync_scope(lookback_days, max_pages)
+    failed_pages = []  # pages whose fetch failed, ending the sync early
+    first_page, validators = fetch_first_page_if_modified(scope if conditional else None)
+    if first_page is None:
+        print("Capitol Trades unchanged since last sync (304 Not Modified)")
+        raw_trades = iter(())
+    else:
+        raw_trades = iter_all_trades(
+            max_pages=max_pages, max_workers=max_workers,
+            first_page=first_page, failed_pages=failed_pages
+        )
 
+    # Process trades as their pages arrive rather than holding every page first
     for raw_trade in raw_trades:
+        # Watchlist misses never get processed (or checked for age)
+        if not _in_watchlists(raw_trade):
+            skipped_filter += 1
+            continue
+
         trade = process_capitol_trade(raw_trade)
         if not trade:
             continue
@@ -259,41 +516,29 @@ def sync_trades(
             skipped_filter += 1
             continue
 
-        # Get or create member
-        member_id = db.get_or_create_member(
-            name=trade["member_name"],
-            chamber=trade["chamber"],
-            party=trade["party"],
-            state=trade["state"],
-            district=trade["district"]
-        )
+        pending.append(trade)
+        if len(pending) >= INSERT_BATCH_SIZE:
+            stored.extend(zip(pending, _store_trades(pending, member_ids)))
+            pending = []
 
-        # Insert trade
-        trade_id = db.insert_trade(
-            member_id=member_id,
-            transaction_date=trade["transaction_date"],
-            disclosure_date=trade["disclosure_date"],
-            ticker=trade["ticker"],
-            asset_description=trade["asset_description"],
-            asset_type=trade["asset_type"],
-            transaction_type=trade["transaction_type"],
-            amount_range=trade["amount_range"],
-            owner=trade["owner"],
-            comment=trade["comment"],
-            source_url=trade["source_url"],
-            cap_gains_over_200=trade["cap_gains_over_200"]
-        )
+    stored.extend(zip(pending, _store_trades(pending, member_ids)))
+    # Only remember page 1's validators once every page's trades are stored; after
+    # a failed fetch the next sync must not skip the pages this one missed
+    if validators and not failed_pages:
+        db.save_http_cache(_page_url(1), scope, validators["etag"], validators["last_modified"])
 
+    for trade, trade_id in stored:
         if trade_id:
             trade["id"] = trade_id
             new_trades.append(trade)
         else:
             duplicates += 1
 
-    # Send notifications for new trades
+    # Send notifications for new trades; the POSTs overlap instead of queueing
     if notify_callback and new_trades:
-        for trade in new_trades:
-            notify_callback(trade)
+        workers = min(config.NOTIFY_WORKERS, len(new_trades))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(notify_callback, new_trades))
 
     # Complete sync
     db.complete_sync(sync_id, len(new_trades))